@@ -1,7 +1,6 @@
 # region imports
 from AlgorithmImports import *
 from datetime import timedelta
-from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 from abc import ABC, abstractmethod
 from enum import Enum
@@ -229,12 +228,26 @@ def calculate_linear_weights(symbols):
     if n <= 1:
         return [1.0]
 
-    worst_weight = 2.0 / (3.0 * n)
-    best_weight = 2.0 * worst_weight
-    step = (best_weight - worst_weight) / (n - 1)
-    weights = [best_weight - i * step for i in range(n)]
-    total = sum(weights)
-    return [w / total for w in weights]
+    # Arithmetic sequence 2w .. w sums to 1.5 * n * w, so w = 1 / (1.5 * n)
+    return (np.linspace(2.0, 1.0, n) / (1.5 * n)).tolist()
+
+
+# Fine-selection score weights:
+#   [ROE, Growth, 1/PE, 1/(1+D/E), log(MCap), GM, R&D]
+# float32 is plenty since the scores are only ranked
+WEIGHTS = np.array([0.2, 0.25, 0.15, 0.05, 0.1, 0.05, 0.2], dtype=np.float32)
+
+
+class SymbolTradeState:
+    """Per-symbol order tracking (entry/stop tickets, timestamps, trailing high)"""
+    __slots__ = ("entry_ticket", "entry_time", "stop_ticket", "stop_fill_time", "highest_price")
+
+    def __init__(self):
+        self.entry_ticket = None
+        self.entry_time = None
+        self.stop_ticket = None
+        self.stop_fill_time = None   # None => no stop has filled, no cooldown
+        self.highest_price = 0
 
 
 class UniverseSelectionAlgorithm(QCAlgorithm):
@@ -253,13 +266,12 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
         self.debt_to_equity_max = 1.0
         self.roe_min = 0.10
         self.stop_loss = 0.07  # 7% trailing stop loss
+        self._stop_mult = 1.0 - self.stop_loss
+        self._cooldown_td = timedelta(days=30)      # no re-entry within 30 days of a stop fill
+        self._entry_stale_td = timedelta(days=2)    # re-price unfilled entries after > 1 day
 
-        # Tracking state
-        self.entryTickets = {}
-        self.stopMarketTickets = {}
-        self.entryTimes = {}
-        self.highestPrices = {}
-        self.stopMarketOrderFillTimes = {}
+        # Tracking state: one SymbolTradeState per symbol
+        self._state = {}
 
         # Initialize Trading Engine
         self.trading_engine = TradingEngine(self)
@@ -293,22 +305,31 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
         return [x.Symbol for x in sorted_by_volume[:500]]
 
     def FineSelectionFunction(self, fine):
-        filtered = []
+        fine = list(fine)
+        # Preallocate the feature matrix and fill it row by row
+        features = np.empty((len(fine), 7), dtype=np.float32)
+        symbols = np.empty(len(fine), dtype=object)
+        n = 0
         for f in fine:
+            # Invalid inputs are screened with explicit checks so nothing raises
+            # in the common case; only malformed fundamental objects fall through
+            # to the except below.
             try:
-                if f.MarketCap < self.min_market_cap:
+                market_cap = f.MarketCap
+                if market_cap is None or market_cap < self.min_market_cap:
                     continue
 
                 pe = f.ValuationRatios.PERatio
                 if pe is None or pe <= self.pe_ratio_min:
                     continue
 
-                equity = f.FinancialStatements.BalanceSheet.TotalEquity.Value
-                debt = f.FinancialStatements.BalanceSheet.TotalDebt.Value
-                if equity <= 0:
+                balance_sheet = f.FinancialStatements.BalanceSheet
+                equity = balance_sheet.TotalEquity.Value
+                debt = balance_sheet.TotalDebt.Value
+                if equity is None or debt is None or equity <= 0:
                     continue
                 d2e = debt / equity
-                if d2e > self.debt_to_equity_max:
+                if d2e > self.debt_to_equity_max or d2e <= -1:
                     continue
 
                 roe = f.OperationRatios.ROE.OneYear
@@ -319,55 +340,55 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
                 if rev_growth is None or rev_growth < 0:
                     continue
 
-                liabilities = f.FinancialStatements.BalanceSheet.CurrentLiabilities.Value
-                assets = f.FinancialStatements.BalanceSheet.CurrentAssets.Value
-                if liabilities <= 0 or (assets / liabilities) < 1.0:
+                liabilities = balance_sheet.CurrentLiabilities.Value
+                assets = balance_sheet.CurrentAssets.Value
+                if liabilities is None or assets is None or liabilities <= 0 or (assets / liabilities) < 1.0:
                     continue
 
-                revenue = f.FinancialStatements.IncomeStatement.TotalRevenue.Value
-                rd = f.FinancialStatements.IncomeStatement.ResearchAndDevelopment.Value
-                rd_ratio = rd / revenue if revenue > 0 else 0
+                income_statement = f.FinancialStatements.IncomeStatement
+                revenue = income_statement.TotalRevenue.Value
+                rd = income_statement.ResearchAndDevelopment.Value
+                rd_ratio = rd / revenue if rd is not None and revenue is not None and revenue > 0 else 0
 
                 gross_margin = f.OperationRatios.GrossMargin.Value
-
-                # Skip invalid or incomplete records
-                if any(x is None for x in [roe, rev_growth, pe, d2e, gross_margin, rd_ratio]):
+                if gross_margin is None:
                     continue
-
-                # Feature vector
-                filtered.append({
-                    "symbol": f.Symbol,
-                    "features": [
-                        roe,
-                        rev_growth,
-                        1 / pe,
-                        1 / (1 + d2e),
-                        np.log(f.MarketCap + 1),
-                        gross_margin,
-                        rd_ratio
-                    ]
-                })
-            except:
+            except (TypeError, AttributeError):
                 continue
 
-        if not filtered:
+            # Feature vector
+            features[n, :] = (
+                roe,
+                rev_growth,
+                1 / pe,
+                1 / (1 + d2e),
+                np.log(market_cap + 1),
+                gross_margin,
+                rd_ratio
+            )
+            symbols[n] = f.Symbol
+            n += 1
+
+        if n == 0:
             return []
 
-        # Normalize and score
-        features_matrix = np.array([row["features"] for row in filtered])
-        scaler = MinMaxScaler()
-        X = scaler.fit_transform(features_matrix)
+        features = features[:n]
+        symbols = symbols[:n]
 
-        weights = np.array([0.2, 0.25, 0.15, 0.05, 0.1, 0.05, 0.2])
-        scores = X.dot(weights)
+        # Min-max normalize in place (constant columns map to 0) and score
+        mn = features.min(axis=0)
+        rng = features.max(axis=0) - mn
+        rng[rng == 0] = 1
+        np.subtract(features, mn, out=features)
+        np.divide(features, rng, out=features)
 
-        # Attach scores
-        for i, row in enumerate(filtered):
-            row["score"] = scores[i]
+        scores = features @ WEIGHTS
 
-        # Sort and return top 10 symbols
-        top = sorted(filtered, key=lambda x: x["score"], reverse=True)[:10]
-        selected = [row["symbol"] for row in top]
+        # Partition out the top 10, then sort only those
+        k = min(10, n)
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
+        selected = list(symbols[top_idx])
         self.Debug(f"Top 10 Selected: {[s.Value for s in selected]}")
         
         return selected
@@ -376,6 +397,8 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
         # Initialize trading indicators for new securities
         for security in changes.AddedSecurities:
             self.trading_engine.initialize_for_symbol(security.Symbol)
+            if security.Symbol not in self._state:
+                self._state[security.Symbol] = SymbolTradeState()
             
         for security in changes.RemovedSecurities:
             self.Liquidate(security.Symbol)
@@ -387,12 +410,14 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
 
         # Get the latest slice (market data)
         slice = self.CurrentSlice
+        securities = self.Securities
 
-        # Filter for symbols that have up-to-date data
-        tradable_symbols = [
-            s for s in symbols
-            if self.Securities[s].HasData and s in slice and slice[s] is not None and slice[s].Price > 0
-        ]
+        # Filter for symbols that have up-to-date data (one slice lookup per symbol)
+        tradable_symbols = []
+        for s in symbols:
+            bar = slice.get(s)
+            if bar is not None and bar.Price > 0 and securities[s].HasData:
+                tradable_symbols.append(s)
 
         if not tradable_symbols:
             self.Debug("No tradable symbols with current price data.")
@@ -409,74 +434,90 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
             return
 
         symbol = orderEvent.Symbol
+        state = self._state.get(symbol)
+        if state is None:
+            return
 
-        if symbol in self.entryTickets and self.entryTickets[symbol].OrderId == orderEvent.OrderId:
-            stop_price = (1 - self.stop_loss) * self.entryTickets[symbol].AverageFillPrice
-            self.stopMarketTickets[symbol] = self.StopMarketOrder(symbol, -self.entryTickets[symbol].Quantity, stop_price)
-            self.highestPrices[symbol] = self.entryTickets[symbol].AverageFillPrice
-            del self.entryTickets[symbol]
-
-        elif symbol in self.stopMarketTickets and self.stopMarketTickets[symbol].OrderId == orderEvent.OrderId:
-            self.stopMarketOrderFillTimes[symbol] = self.Time
-            self.highestPrices[symbol] = 0
-            del self.stopMarketTickets[symbol]
+        entry = state.entry_ticket
+        stop = state.stop_ticket
+        if entry is not None and entry.OrderId == orderEvent.OrderId:
+            fill_price = entry.AverageFillPrice
+            state.stop_ticket = self.StopMarketOrder(symbol, -entry.Quantity, self._stop_mult * fill_price)
+            state.highest_price = fill_price
+            state.entry_ticket = None
+
+        elif stop is not None and stop.OrderId == orderEvent.OrderId:
+            state.stop_fill_time = self.Time
+            state.highest_price = 0
+            state.stop_ticket = None
             self.Debug(f"Stop loss filled for {symbol}, cooldown started")
 
     def OnData(self, data):
         if self.IsWarmingUp:
             return
 
+        now = self.Time
+        portfolio = self.Portfolio
+        engine = self.trading_engine
         symbols = list(self.ActiveSecurities.Keys)
-        
-        # MODULAR TRADING LOGIC - Easy to switch strategies!
+        n_active = len(symbols)
+        stop_mult = self._stop_mult
+        cooldown_td = self._cooldown_td
+        entry_stale_td = self._entry_stale_td
+        states = self._state
+
         for symbol in symbols:
-            if symbol not in data or not data[symbol]:
+            if symbol not in data:
+                continue
+            bar = data[symbol]
+            if not bar:
                 continue
 
+            # MODULAR TRADING LOGIC - Easy to switch strategies!
             # Get trading signal from active strategy
-            signal = self.trading_engine.get_trading_signal(symbol, data)
+            signal = engine.get_trading_signal(symbol, data)
             
             # Execute trade based on signal
             if signal != TradingSignal.HOLD:
-                self.trading_engine.execute_trade(symbol, signal, data)
+                engine.execute_trade(symbol, signal, data)
 
-        # Original stop-loss and order management logic
-        for symbol in symbols:
-            if symbol not in data or not data[symbol]:
-                continue
+            # Original stop-loss and order management logic
+            price = bar.Price
 
-            price = data[symbol].Price
+            state = states.get(symbol)
+            if state is None:
+                state = states[symbol] = SymbolTradeState()
 
-            if symbol not in self.stopMarketOrderFillTimes:
-                self.stopMarketOrderFillTimes[symbol] = self.Time - timedelta(days=31)
-
-            if (self.Time - self.stopMarketOrderFillTimes[symbol]).days < 30:
+            if state.stop_fill_time is not None and now - state.stop_fill_time < cooldown_td:
                 continue
 
-            if (not self.Portfolio[symbol].Invested and
-                symbol not in self.entryTickets and
+            holding = portfolio[symbol]
+            ticket = state.entry_ticket
+
+            if (not holding.Invested and
+                ticket is None and
                 not self.Transactions.GetOpenOrders(symbol)):
 
-                quantity = int((self.Portfolio.Cash / len(symbols)) / price)
+                quantity = int((portfolio.Cash / n_active) / price)
                 if quantity > 0:
-                    self.entryTickets[symbol] = self.LimitOrder(symbol, quantity, price)
-                    self.entryTimes[symbol] = self.Time
+                    ticket = state.entry_ticket = self.LimitOrder(symbol, quantity, price)
+                    state.entry_time = now
 
-            if (symbol in self.entryTickets and
-                symbol in self.entryTimes and
-                (self.Time - self.entryTimes[symbol]).days > 1 and
-                self.entryTickets[symbol].Status != OrderStatus.Filled):
+            if (ticket is not None and
+                state.entry_time is not None and
+                now - state.entry_time >= entry_stale_td and
+                ticket.Status != OrderStatus.Filled):
 
                 update = UpdateOrderFields()
                 update.LimitPrice = price
-                self.entryTickets[symbol].Update(update)
-                self.entryTimes[symbol] = self.Time
+                ticket.Update(update)
+                state.entry_time = now
 
-            if (symbol in self.stopMarketTickets and
-                self.Portfolio[symbol].Invested and
-                price > self.highestPrices[symbol]):
+            if (state.stop_ticket is not None and
+                holding.Invested and
+                price > state.highest_price):
 
-                self.highestPrices[symbol] = price
+                state.highest_price = price
                 update = UpdateOrderFields()
-                update.StopPrice = price * (1 - self.stop_loss)
-                self.stopMarketTickets[symbol].Update(update)
+                update.StopPrice = price * stop_mult
+                state.stop_ticket.Update(update)
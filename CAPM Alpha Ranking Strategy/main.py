@@ -53,22 +53,22 @@ class BetaAlgorithm(QCAlgorithm):
             self.set_holdings(symbol, 0.5)
 
     def _select_symbols(self, history):
-        alphas = dict()
-
-        # Get the benchmark returns
-        benchmark = history[self._benchmark].pct_change().dropna()
-
-        # Conducts linear regression for each symbol and save the intercept/alpha
-        for symbol in self._symbols:
-            
-            # Get the security returns
-            returns = history[symbol].pct_change().dropna()
-            bla = np.vstack([benchmark, np.ones(len(returns))]).T
-
-            # Simple linear regression function in Numpy
-            result = np.linalg.lstsq(bla , returns)
-            alphas[symbol] = result[0][1]
+        # Daily returns straight from the price array; drop days with any gap
+        prices = history[[self._benchmark] + self._symbols].to_numpy()
+        returns = prices[1:] / prices[:-1] - 1.0
+        returns = returns[~np.isnan(returns).any(axis=1)]
+        b = returns[:, 0]    # benchmark (T,)
+        R = returns[:, 1:]   # symbols (T, K)
+
+        # Closed-form OLS of every symbol on the benchmark at once:
+        # beta = cov(b, r) / var(b), alpha (intercept) = mean(r) - beta * mean(b)
+        b_mean = b.mean()
+        R_mean = R.mean(axis=0)
+        b_c = b - b_mean
+        betas = (b_c @ (R - R_mean)) / (b_c @ b_c)
+        alphas = R_mean - betas * b_mean
 
         # Select symbols with the highest intercept/alpha to the benchmark
-        selected = sorted(alphas.items(), key=lambda x: x[1], reverse=True)[:2]
-        return [x[0] for x in selected]
+        top = np.argpartition(-alphas, 1)[:2]
+        top = top[np.argsort(-alphas[top], kind="stable")]
+        return [self._symbols[i] for i in top]
@@ -78,26 +78,28 @@ class GaussianNaiveBayesAlphaModel(AlphaModel):
         """
         Trains the Gaussian Naive Bayes classifier model.
         """
-        features = pd.DataFrame()
+        frames = []
         labels_by_symbol = {}
 
         self.tradable_symbols = []
         for symbol, symbol_data in self.symbol_data_by_symbol.items():
             if symbol_data.is_ready:
                 self.tradable_symbols.append(symbol)
-                features = pd.concat([features, symbol_data.features_by_day], axis=1)
+                frames.append(symbol_data.features_by_day)
                 labels_by_symbol[symbol] = symbol_data.labels_by_day
         
+        # Concatenate once instead of growing the frame symbol by symbol
+        features = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        
         # The first and last row can have NaNs because this `train` method fires when 
         #  the universe changes, which is before the consolidated bars close. Let's remove them
         features.dropna(inplace=True) 
 
         # Find the index which can is common to all of the features and labels
-        idx = set([t for t in features.index])
-        for i, (symbol, labels) in enumerate(labels_by_symbol.items()):
-            a = set([t for t in labels.index])
-            idx &= a
-        idx = sorted(list(idx))
+        idx = features.index
+        for labels in labels_by_symbol.values():
+            idx = idx.intersection(labels.index)
+        idx = idx.sort_values()
         
         for symbol, symbol_data in self.symbol_data_by_symbol.items():
             if symbol_data.is_ready and not features.loc[idx].empty and not labels_by_symbol[symbol].loc[idx].empty:
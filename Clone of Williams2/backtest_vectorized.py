@@ -0,0 +1,209 @@
+# region imports
+from AlgorithmImports import *
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+import numpy as np
+from scipy.signal import lfilter
+from numpy.lib.stride_tricks import sliding_window_view
+from numba_utils import njit
+# endregion
+
+# ---------------------------
+# Vectorized Alligator + ATR backtest (research only)
+# ---------------------------
+# A simplified proxy of the strategy in main.py, run over whole price arrays
+# instead of one OnData call per bar, so parameters (atr_multiplier,
+# price_filter_k, ...) can be screened quickly in research.ipynb before
+# running a full backtest. Entries only require lips > teeth > jaw and the
+# HL2 z-score filter; main.py's EMA trend filter, lips-over-teeth cross
+# trigger, lips/HL2 gap check, peak confirmation wait and startup entry are
+# not modelled, so rankings from a sweep need confirming in a full backtest.
+# Indicators and entry/exit conditions are computed array-wise; only the
+# position walk (highest close since entry) is sequential and runs in one
+# njit loop. Fills are at the signal bar's close with no fees or slippage.
+
+
+def smma(prices, length):
+    """Smoothed moving average seeded with the first price (same recursion as AlligatorSMMA)."""
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) == 0:
+        return prices
+    # s[t] = s[t-1] + (p[t] - s[t-1]) / L as a first-order IIR filter
+    a = 1.0 / length
+    out = np.empty_like(prices)
+    out[0] = prices[0]
+    out[1:] = lfilter([a], [1.0, a - 1.0], prices[1:], zi=[prices[0] * (1.0 - a)])[0]
+    return out
+
+
+def wilder_atr(high, low, close, period):
+    """Average True Range with Wilder smoothing, NaN until `period` bars are available."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    atr = np.full_like(tr, np.nan)
+    if len(tr) < period:
+        return atr
+    # seeded with the simple mean of the first `period` true ranges, then RMA
+    seed = tr[:period].mean()
+    a = 1.0 / period
+    atr[period - 1] = seed
+    atr[period:] = lfilter([a], [1.0, a - 1.0], tr[period:], zi=[seed * (1.0 - a)])[0]
+    return atr
+
+
+def rolling_zscore(values, lookback):
+    """Population z-score of each value against its trailing `lookback` window, NaN while filling."""
+    values = np.asarray(values, dtype=np.float64)
+    z = np.full_like(values, np.nan)
+    if len(values) < lookback:
+        return z
+    windows = sliding_window_view(values, lookback)
+    mean = windows.mean(axis=1)
+    std = windows.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z[lookback - 1:] = np.where(std > 0.0, (values[lookback - 1:] - mean) / std, 0.0)
+    return z
+
+
+# same FMA contraction of the ATR stop as _exit_decision in main.py
+@njit(cache=True, fastmath={"contract"})
+def _walk_positions(close, atr, entry_ok, cross_exit, atr_multiplier):
+    """Position (0/1) held after each bar's close given the entry and exit conditions."""
+    n = len(close)
+    position = np.zeros(n, dtype=np.int8)
+    invested = False
+    highest = 0.0
+    for t in range(n):
+        price = close[t]
+        if invested:
+            if price > highest:
+                highest = price
+            if cross_exit[t] or price <= highest - atr_multiplier * atr[t]:
+                invested = False
+        elif entry_ok[t]:
+            invested = True
+            highest = price
+        position[t] = 1 if invested else 0
+    return position
+
+
+def run_backtest(high, low, close,
+                 jaw_length=13, teeth_length=8, lips_length=5,
+                 atr_period=14, atr_multiplier=1.8,
+                 price_filter_lookback=20, price_filter_k=1.0,
+                 use_entry_price_filter=True):
+    """
+    Backtest the Alligator + ATR stop strategy on OHLC arrays.
+
+    Entry: lips > teeth > jaw (and z-score of HL2 at or below +k when the
+    price filter is on; no entry until the z-score window is full, like
+    main.py's entry_price_filter). This is a simplified proxy of main.py,
+    see the module comment for the filters it leaves out.
+
+    Exit: lips cross below jaw, or close at or below the highest close since
+    entry minus atr_multiplier * ATR.
+
+    Returns a dict with the position and equity arrays plus summary stats
+    (total_return, sharpe, max_drawdown, trades).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    hl2 = 0.5 * (high + low)
+    jaw = smma(hl2, jaw_length)
+    teeth = smma(hl2, teeth_length)
+    lips = smma(hl2, lips_length)
+    atr = wilder_atr(high, low, close, atr_period)
+
+    # the strategy only trades once the Alligator lines and the ATR are ready
+    ready = np.arange(len(close)) >= max(jaw_length, teeth_length, lips_length, atr_period) - 1
+    entry_ok = ready & (lips > teeth) & (teeth > jaw)
+    if use_entry_price_filter:
+        z = rolling_zscore(hl2, price_filter_lookback)
+        entry_ok &= z <= price_filter_k           # NaN while warming up → no entry
+    cross_exit = np.zeros(len(close), dtype=np.bool_)
+    cross_exit[1:] = (lips[:-1] >= jaw[:-1]) & (lips[1:] < jaw[1:])
+
+    position = _walk_positions(close, atr, entry_ok, cross_exit, float(atr_multiplier))
+
+    # position taken at bar t's close earns bar t+1's return
+    returns = np.zeros(len(close))
+    returns[1:] = position[:-1] * (close[1:] / close[:-1] - 1.0)
+    equity = np.cumprod(1.0 + returns)
+    return dict(position=position, equity=equity, **_summary(returns, equity, position))
+
+
+def _summary(returns, equity, position):
+    """Total return, annualized Sharpe (daily bars), max drawdown and number of entries."""
+    if len(equity) == 0:
+        return dict(total_return=0.0, sharpe=0.0, max_drawdown=0.0, trades=0)
+    std = returns.std()
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity)
+    return dict(
+        total_return=float(equity[-1] - 1.0),
+        sharpe=float(np.sqrt(252) * returns.mean() / std) if std > 0 else 0.0,
+        max_drawdown=float(drawdown.max()),
+        trades=int(np.count_nonzero(np.diff(position, prepend=0) == 1)),
+    )
+
+
+# ---------------------------
+# Parallel parameter sweep
+# ---------------------------
+# Every parameter set is an independent run over the same prices, so the
+# grid is spread over a process pool. The OHLC arrays are placed once in
+# shared memory; workers map views onto it instead of unpickling the
+# prices for every task.
+_worker_shm = None
+_worker_ohlc = None
+
+
+def param_grid(**axes):
+    """All combinations of the given parameter axes, e.g. param_grid(atr_multiplier=[1.5, 2.0], price_filter_k=[1.0, 1.5])."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in product(*axes.values())]
+
+
+def _attach_shared(name, shape):
+    global _worker_shm, _worker_ohlc
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_ohlc = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+
+
+def _run_shared(params):
+    high, low, close = _worker_ohlc
+    result = run_backtest(high, low, close, **params)
+    return {k: result[k] for k in ("total_return", "sharpe", "max_drawdown", "trades")}
+
+
+def sweep(high, low, close, param_sets, max_workers=None):
+    """
+    Run run_backtest for every dict in param_sets in parallel.
+    Returns one dict per parameter set: the parameters plus its summary stats.
+    """
+    ohlc = np.vstack([np.asarray(high, dtype=np.float64),
+                      np.asarray(low, dtype=np.float64),
+                      np.asarray(close, dtype=np.float64)])
+    # Compile the position walk once here: forked workers inherit it (and the
+    # on-disk cache=True entry) instead of each paying for its own JIT compile
+    _walk_positions(ohlc[2, :1], ohlc[2, :1], np.zeros(1, dtype=np.bool_), np.zeros(1, dtype=np.bool_), 1.0)
+
+    shm = shared_memory.SharedMemory(create=True, size=ohlc.nbytes)
+    try:
+        np.ndarray(ohlc.shape, dtype=np.float64, buffer=shm.buf)[:] = ohlc
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_attach_shared,
+                                 initargs=(shm.name, ohlc.shape)) as pool:
+            stats = list(pool.map(_run_shared, param_sets))
+    finally:
+        shm.close()
+        shm.unlink()
+    return [dict(params, **result) for params, result in zip(param_sets, stats)]
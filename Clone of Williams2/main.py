@@ -1,7 +1,9 @@
 # region imports
 from AlgorithmImports import *
-from QuantConnect.Indicators import MovingAverageType
+from collections import defaultdict
 import numpy as np
+from scipy.stats import zscore
+from numba_utils import njit
 # endregion
 
 # ----------------------------
@@ -41,29 +43,169 @@ def is_trending_ema(ts1, ts2, ts3, short=5, long=20, slope_threshold=0.01):
 
 
 # ---------------------------
-# Simple SMMA
+# Alligator SMMA lines
 # ---------------------------
-class SMMAIndicator:
-    def __init__(self, length):
-        self.length = length
-        self.current = None
-        self.count = 0
+@njit(cache=True)
+def _alligator_step(current, lengths, price):
+    """Advance every SMMA lane of `current` in place by one price."""
+    for i in range(current.shape[0]):
+        current[i] = (current[i] * (lengths[i] - 1.0) + price) / lengths[i]
+
+
+@njit(cache=True)
+def _alligator_run(current, lengths, prices):
+    """Run the SMMA recurrence over a whole price array."""
+    for j in range(prices.shape[0]):
+        _alligator_step(current, lengths, prices[j])
+
+
+class AlligatorSMMA:
+    """Jaw, teeth and lips SMMA lines kept as a single 3-lane state."""
+    def __init__(self, jaw_length, teeth_length, lips_length):
+        self.lengths = np.array([jaw_length, teeth_length, lips_length], dtype=np.float64)
+        self.current = np.zeros(3, dtype=np.float64)
+        self.count = 0  # only counted until the lines are ready
+        self._max_length = max(jaw_length, teeth_length, lips_length)
+        self._ready = False
 
     def Update(self, price):
-        if self.current is None:
-            self.current = price
+        """Update all three lines with a new price. Returns (jaw, teeth, lips)."""
+        if self._ready:
+            _alligator_step(self.current, self.lengths, price)
         else:
-            self.current = (self.current * (self.length - 1) + price) / self.length
-        self.count += 1
-        return self.current
+            if self.count == 0:
+                self.current[:] = price
+            else:
+                _alligator_step(self.current, self.lengths, price)
+            self.count += 1
+            self._ready = self.count >= self._max_length
+        return tuple(self.current.tolist())
+
+    def warm_up(self, prices):
+        """Feed an array of prices in one call (same result as Update on each)."""
+        if len(prices) == 0:
+            return self.Current
+        if self.count == 0:
+            self.current[:] = prices[0]
+            self.count += 1
+            prices = prices[1:]
+        _alligator_run(self.current, self.lengths, prices)
+        self.count += len(prices)
+        self._ready = self.count >= self._max_length
+        return self.Current
 
     @property
     def IsReady(self):
-        return self.count >= self.length
+        return self._ready
 
     @property
     def Current(self):
-        return self.current
+        if self.count == 0:
+            return None, None, None
+        return tuple(self.current.tolist())
+
+
+# ---------------------------
+# Entry / exit decisions
+# ---------------------------
+ENTRY_NONE, ENTRY_STARTUP, ENTRY_CROSS = 0, 1, 2
+EXIT_NONE, EXIT_CROSS, EXIT_ATR = 0, 1, 2
+
+
+@njit(cache=True)
+def _entry_decision(startup, lips_prev, teeth_prev, lips, teeth):
+    """
+    Action code for a trending bar: ENTRY_STARTUP, ENTRY_CROSS (lips crossed
+    above teeth) or ENTRY_NONE. Missing previous values are passed as NaN.
+    """
+    if startup:
+        return ENTRY_STARTUP
+    if lips_prev <= teeth_prev and lips > teeth:
+        return ENTRY_CROSS
+    return ENTRY_NONE
+
+
+# fastmath "contract" only lets LLVM fuse highest - atr_mult * atr_val into one
+# FMA (a single rounding); no other IEEE semantics are relaxed
+@njit(cache=True, fastmath={"contract"})
+def _exit_decision(price, highest, lips_prev, jaw_prev, lips, jaw, atr_val, atr_mult):
+    """
+    (action code, updated trailing high) for an invested bar: EXIT_CROSS
+    (lips crossed below jaw), EXIT_ATR (price at or below highest - atr_mult*ATR)
+    or EXIT_NONE. Missing previous values / highest are passed as NaN.
+    """
+    if highest != highest or price > highest:  # NaN => first bar in the trade
+        highest = price
+    if lips_prev >= jaw_prev and lips < jaw:
+        return EXIT_CROSS, highest
+    if price <= highest - atr_mult * atr_val:
+        return EXIT_ATR, highest
+    return EXIT_NONE, highest
+
+
+# ---------------------------
+# Fixed-size ring buffer
+# ---------------------------
+class RingBuffer:
+    """Fixed-capacity float64 series keeping only the most recent `capacity` values."""
+    def __init__(self, capacity, stats_window=0):
+        """stats_window > 0 also keeps a rolling Welford mean / M2 of the last stats_window values."""
+        self.capacity = capacity
+        # every value is written twice so the stored window is always one contiguous slice
+        self._buf = np.empty(2 * capacity, dtype=np.float64)
+        self._pos = 0
+        self._size = 0
+        self.count = 0  # total values pushed since creation
+        self.stats_window = min(stats_window, capacity)
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from _mean
+
+    def push(self, value):
+        n = self.stats_window
+        if n:
+            if self._size >= n:
+                # fixed-size Welford step: the value dropping out of the stats window is replaced
+                old = self._buf[self._pos + self.capacity - n]
+                mean = self._mean + (value - old) / n
+                self._m2 += (value - old) * (value - mean + old - self._mean)
+                self._mean = mean
+            else:
+                delta = value - self._mean
+                self._mean += delta / (self._size + 1)
+                self._m2 += delta * (value - self._mean)
+        self._buf[self._pos] = value
+        self._buf[self._pos + self.capacity] = value
+        pos = self._pos + 1
+        self._pos = 0 if pos == self.capacity else pos
+        if self._size < self.capacity:
+            self._size += 1
+        self.count += 1
+        if n and self._size >= n and self.count % n == 0:
+            # re-derive the window stats exactly every n pushes so rounding drift cannot build up
+            window = self.tail(n)
+            self._mean = window.mean()
+            self._m2 = float(np.square(window - self._mean).sum())
+
+    def last(self, k=1):
+        """k-th most recent value (1 = newest), same as list[-k]."""
+        return self._buf[self._pos + self.capacity - k]
+
+    def tail(self, k):
+        """Zero-copy view of the last k stored values (fewer if not filled yet), oldest first."""
+        end = self._pos + self.capacity
+        return self._buf[end - min(k, self._size):end]
+
+    def window_mean_std(self):
+        """Mean and population std of the last stats_window values (valid once that many are stored)."""
+        mean = self._mean
+        var = self._m2 / self.stats_window
+        # a flat window leaves only rounding residue: report it as exactly 0 so std == 0 checks hold
+        if var <= 1e-12 * mean * mean:
+            return mean, 0.0
+        return mean, var ** 0.5
+
+    def __len__(self):
+        return self._size
 
 
 # ---------------------------
@@ -79,15 +221,15 @@ class AlligatorStopLossQC(QCAlgorithm):
         # Store initial equity for performance normalization
         self.initial_equity = float(self.portfolio.total_portfolio_value)
         self.ticker_str = "NVDA"
-        self.chosen_symbol = self.add_equity(self.ticker_str, Resolution.DAILY).Symbol
+        self._security = self.add_equity(self.ticker_str, Resolution.DAILY)
+        self.chosen_symbol = self._security.Symbol
         self.set_benchmark(self.ticker_str)
         self.settings.daily_precise_end_time = False
 
-        # --- Series buffers ---
-        self.hl2s, self.highs, self.lows, self.closes = [], [], [], []
-        # No need to store these lists, as SMMAIndicator holds its state
-        self.lips_list, self.teeth_list, self.jaws_list = [], [], []
-        self.atr_upper_list, self.atr_lower_list = [], []
+        # Chart / series names (built once, used on every plot call)
+        self._alligator_chart = f"{self.ticker_str} Alligator"
+        self._atr_chart = f"{self.ticker_str} Average True Range from Price"
+        self._norm_series = self.ticker_str + "Norm"
 
         # --- Params (tune here) ---
         self.use_entry_price_filter = True
@@ -100,14 +242,43 @@ class AlligatorStopLossQC(QCAlgorithm):
 
         self.warm_up_period = 100
         self.lips_price_gap_pct = 1.00
+        self._lips_gap_mult = 1.0 + 0.01 * self.lips_price_gap_pct
         self.cooldown_days_remaining = 0
         self.cooldown_days = 3
         self.stopLossPct = 0.03
         self.trailingStopPct = 0.03
+        self._stop_mult = 1.0 - self.stopLossPct
+        self._trail_mult = 1.0 - self.trailingStopPct
         self.jawLength, self.teethLength, self.lipsLength = 20, 12, 8
+        # Need at least one full period of the longest SMMA
+        self._min_len = max(self.jawLength, self.teethLength, self.lipsLength) + 1
         self.atr_period = 14
         self.atr_multiplier = 1.8
         self.slope_threshold = 0.05
+        self.trend_window = 20
+        # Charting crosses into the engine on every call; pass enable_charts=0 to skip it in sweeps
+        self.enable_charts = self.live_mode or self.get_parameter("enable_charts", 1) == 1
+        self._plot = self._queue_point if self.enable_charts else (lambda *args, **kwargs: None)
+        # Chart points are queued per series and handed to the series every
+        # chart_flush_every bars (and at the end) instead of one plot() call each
+        self._series = {}
+        self._chart_buf = defaultdict(list)
+        self._chart_flush_every = 1 if self.live_mode else max(1, int(self.get_parameter("chart_flush_every", 20)))
+        self._chart_flush_i = 0
+        # Line series are sampled every plot_every bars (trade markers are always plotted)
+        self._plot_every = max(1, int(self.get_parameter("plot_every", 1)))
+        self._plot_i = 0
+        self._plot_due = False
+        # Same for the per-trade / per-filter log lines (enable_logs=0 skips building them)
+        self.enable_logs = self.live_mode or self.get_parameter("enable_logs", 1) == 1
+        # diag_zscore=1 cross-checks the running z-score against scipy on the raw window
+        self._diag = self.get_parameter("diag_zscore", 0) == 1
+
+        # --- Series buffers (fixed size, only the recent tail is ever read) ---
+        n = max(self.trend_window, self.price_filter_lookback)
+        # hl2s also tracks the running z-score stats over the price-filter lookback
+        self.hl2s = RingBuffer(n, stats_window=self.price_filter_lookback)
+        self.lips_list, self.teeth_list = RingBuffer(n), RingBuffer(n)
 
         # --- State ---
         self.entryPrice = None
@@ -116,9 +287,12 @@ class AlligatorStopLossQC(QCAlgorithm):
 
         # --- Indicator Initializations ---
         self.atr_sl_ind = self.atr(self.chosen_symbol, self.atr_period, MovingAverageType.WILDERS, Resolution.DAILY)
-        self.jaw = SMMAIndicator(self.jawLength)
-        self.teeth = SMMAIndicator(self.teethLength)
-        self.lips = SMMAIndicator(self.lipsLength)
+        self._atr = self.atr_sl_ind
+        self.alligator = AlligatorSMMA(self.jawLength, self.teethLength, self.lipsLength)
+        # Compile the SMMA kernel now so the first live bar doesn't pay for it
+        _alligator_step(np.zeros(3), np.ones(3), 1.0)
+        _entry_decision(False, 1.0, 1.0, 1.0, 1.0)
+        _exit_decision(1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
 
         # FIX: Get the benchmark price from the first available trading day
         history_start = self.history[TradeBar](
@@ -133,6 +307,9 @@ class AlligatorStopLossQC(QCAlgorithm):
             self.initial_symbol_price = float(first_bar.close)
         else:
             self.initial_symbol_price = 1.0
+        # normalization factors for the performance chart (multiply instead of divide per bar)
+        self._equity_scale = 100.0 / self.initial_equity
+        self._symbol_scale = 100.0 / self.initial_symbol_price
 
         # Warm up indicators with history
         history = self.history[TradeBar](
@@ -140,89 +317,112 @@ class AlligatorStopLossQC(QCAlgorithm):
             timedelta(days=self.warm_up_period),
             Resolution.DAILY
         )
-        for bar in history:
+        bars = list(history)
+        for bar in bars:
             self.atr_sl_ind.Update(bar)
-            hl2 = (bar.high + bar.low) / 2.0
-            self.jaw.Update(hl2)
-            self.teeth.Update(hl2)
-            self.lips.Update(hl2)
+        highs = np.fromiter((bar.high for bar in bars), dtype=np.float64, count=len(bars))
+        lows = np.fromiter((bar.low for bar in bars), dtype=np.float64, count=len(bars))
+        hl2_arr = 0.5 * (highs + lows)
+        self.alligator.warm_up(hl2_arr)
 
         # Charts
-        self._init_charts()
+        if self.enable_charts:
+            self._init_charts()
 
         # Previous values placeholder
-        self.jaw_prev = self.jaw.Current
-        self.teeth_prev = self.teeth.Current
-        self.lips_prev = self.lips.Current
+        self.jaw_prev, self.teeth_prev, self.lips_prev = self.alligator.Current
+
+        # Bar handler used by OnData until warm-up completes
+        self._on_data = self._on_data_warmup
+
+    def OnEndOfAlgorithm(self):
+        if self.enable_charts:
+            self._flush_charts()
 
 
     # ---------- Charting ----------
+    def _add_series(self, chart, series):
+        chart.add_series(series)
+        self._series[(chart.name, series.name)] = series
+
+    def _queue_point(self, chart_name, series_name, value):
+        # QCAlgorithm.plot stamps points in UTC, so queued points do too
+        self._chart_buf[(chart_name, series_name)].append((self.utc_time, value))
+
+    def _flush_charts(self):
+        series = self._series
+        for key, points in self._chart_buf.items():
+            add_point = series[key].add_point
+            for t, v in points:
+                add_point(t, v)
+        self._chart_buf.clear()
+
     def _init_charts(self):
         # Price + Alligator + markers
-        chart = Chart(f"{self.ticker_str} Alligator")
+        chart = Chart(self._alligator_chart)
 
         series_symbol = Series(self.ticker_str, SeriesType.LINE, unit="")
         series_symbol.color = Color.BLACK
-        chart.add_series(series_symbol)
+        self._add_series(chart, series_symbol)
 
         series_jaw = Series("Jaw", SeriesType.LINE, unit="")
         series_jaw.color = Color.BLUE
-        chart.add_series(series_jaw)
+        self._add_series(chart, series_jaw)
 
         series_teeth = Series("Teeth", SeriesType.LINE, unit="")
         series_teeth.color = Color.RED
-        chart.add_series(series_teeth)
+        self._add_series(chart, series_teeth)
 
         series_lips = Series("Lips", SeriesType.LINE, unit="")
         series_lips.color = Color.GREEN
-        chart.add_series(series_lips)
+        self._add_series(chart, series_lips)
 
         buy_series = Series("Buy", SeriesType.SCATTER, unit="")
         buy_series.color = Color.GREEN
         buy_series.scatter_marker_symbol = ScatterMarkerSymbol.TRIANGLE
         buy_series.width = 6
-        chart.add_series(buy_series)
+        self._add_series(chart, buy_series)
 
         sell_series = Series("Sell", SeriesType.SCATTER, unit="")
         sell_series.color = Color.RED
         sell_series.scatter_marker_symbol = ScatterMarkerSymbol.TRIANGLE_DOWN
         sell_series.width = 6
-        chart.add_series(sell_series)
+        self._add_series(chart, sell_series)
 
         self.add_chart(chart)
 
         # Performance
         perf = Chart("Performance")
-        perf.add_series(Series("StrategyNorm", SeriesType.LINE, unit=""))
-        perf.add_series(Series(self.ticker_str+"Norm", SeriesType.LINE, unit=""))
+        self._add_series(perf, Series("StrategyNorm", SeriesType.LINE, unit=""))
+        self._add_series(perf, Series(self._norm_series, SeriesType.LINE, unit=""))
         self.add_chart(perf)
 
         # Average True Range
-        ATRchart = Chart(f"{self.ticker_str} Average True Range from Price")
+        ATRchart = Chart(self._atr_chart)
         
         series_symbol = Series(self.ticker_str, SeriesType.LINE, unit="")
         series_symbol.color = Color.BLACK
-        ATRchart.add_series(series_symbol)
+        self._add_series(ATRchart, series_symbol)
         
         ATR_upper = Series("upper_ATR", SeriesType.LINE, unit="")
         ATR_upper.color = Color.BLUE
-        ATRchart.add_series(ATR_upper)
+        self._add_series(ATRchart, ATR_upper)
 
         ATR_lower = Series("lower_ATR", SeriesType.LINE, unit="")
         ATR_lower.color = Color.BLUE
-        ATRchart.add_series(ATR_lower)
+        self._add_series(ATRchart, ATR_lower)
 
         buy_series = Series("Buy", SeriesType.SCATTER, unit="")
         buy_series.color = Color.GREEN
         buy_series.scatter_marker_symbol = ScatterMarkerSymbol.TRIANGLE
         buy_series.width = 6
-        ATRchart.add_series(buy_series)
+        self._add_series(ATRchart, buy_series)
 
         sell_series = Series("Sell", SeriesType.SCATTER, unit="")
         sell_series.color = Color.RED
         sell_series.scatter_marker_symbol = ScatterMarkerSymbol.TRIANGLE_DOWN
         sell_series.width = 6
-        ATRchart.add_series(sell_series)
+        self._add_series(ATRchart, sell_series)
 
         self.add_chart(ATRchart)
 
@@ -233,27 +433,33 @@ class AlligatorStopLossQC(QCAlgorithm):
         self.entryPrice = bar.close
         self.highestPrice = bar.close
         self.cooldown_days_remaining = self.cooldown_days
-        self.log(f"{self.time} - BUY: {reason} @ {bar.close:.2f}")
-        self.plot(f"{self.ticker_str} Alligator", "Buy", bar.close)
-        self.plot(f"{self.ticker_str} Average True Range from Price", "Buy", bar.close)
+        if self.enable_logs:
+            self.log(f"{self.time} - BUY: {reason} @ {bar.close:.2f}")
+        self._plot(self._alligator_chart, "Buy", bar.close)
+        self._plot(self._atr_chart, "Buy", bar.close)
 
     def sell_act(self, bar, reason):
         self.liquidate(self.chosen_symbol)
-        self.log(f"{self.time} - SELL: {reason} @ {bar.close:.2f}")
-        self.plot(f"{self.ticker_str} Alligator", "Sell", bar.close)
-        self.plot(f"{self.ticker_str} Average True Range from Price", "Sell", bar.close)
+        if self.enable_logs:
+            self.log(f"{self.time} - SELL: {reason} @ {bar.close:.2f}")
+        self._plot(self._alligator_chart, "Sell", bar.close)
+        self._plot(self._atr_chart, "Sell", bar.close)
         self.entryPrice = None
         self.highestPrice = None
 
     def update_performance(self, bar):
+        # nothing to compute when the chart isn't drawn on this bar
+        if not self._plot_due:
+            return
+
         # normalized to 100 at baseline
-        normalized_equity = 100.0 * (float(self.portfolio.total_portfolio_value) / self.initial_equity)
+        normalized_equity = self.portfolio.total_portfolio_value * self._equity_scale
         
         # Use the pre-calculated initial_symbol_price from Initialize() for normalization.
-        normalized_symbol = 100.0 * (bar.close / self.initial_symbol_price)
+        normalized_symbol = bar.close * self._symbol_scale
 
-        self.plot("Performance", "StrategyNorm"        , normalized_equity)
-        self.plot("Performance", self.ticker_str+"Norm", normalized_symbol)
+        self._plot("Performance", "StrategyNorm"        , normalized_equity)
+        self._plot("Performance", self._norm_series, normalized_symbol)
 
 
     # ---------- Core computations ----------
@@ -261,43 +467,40 @@ class AlligatorStopLossQC(QCAlgorithm):
         """Update rolling arrays and SMMA lines. Return (hl2, jaw, teeth, lips) or (None, ... ) if not ready."""
         hl2 = (bar.high + bar.low) / 2.0
 
-        self.highs.append(bar.high)
-        self.lows.append(bar.low)
-        self.closes.append(bar.close)
-        self.hl2s.append(hl2)
+        self.hl2s.push(hl2)
 
-        # Need at least one full period of the longest SMMA
-        min_len = max(self.jawLength, self.teethLength, self.lipsLength) + 1
-        if len(self.hl2s) < min_len:
+        if self.hl2s.count < self._min_len:
             return None, None, None, None, None, None
 
-        jaw = self.jaw.Update(hl2)
-        teeth = self.teeth.Update(hl2)
-        lips = self.lips.Update(hl2)
+        return self._update_lines(bar, hl2)
 
+    def _update_lines(self, bar, hl2):
+        """Steady-state part of update_indicators, once the buffers hold _min_len values."""
+        jaw, teeth, lips = self.alligator.Update(hl2)
 
-        self.lips_list.append(lips)
-        self.teeth_list.append(teeth)
-        self.jaws_list.append(jaw)
+        self.lips_list.push(lips)
+        self.teeth_list.push(teeth)
 
          # ATR update  ### ATR
-        self.atr_sl_ind.Update(bar)
+        atr = self._atr
+        atr.Update(bar)
+        # the bands are only plotted, so skip them when charting is off
         upper_ATR, lower_ATR = None, None
-        if self.atr_sl_ind.IsReady:
-            upper_ATR = bar.close + self.atr_multiplier * self.atr_sl_ind.Current.Value
-            lower_ATR = bar.close - self.atr_multiplier * self.atr_sl_ind.Current.Value
-            self.atr_upper_list.append(upper_ATR)
-            self.atr_lower_list.append(lower_ATR)
+        if self.enable_charts and atr.IsReady:
+            band = self.atr_multiplier * atr.Current.Value
+            upper_ATR = bar.close + band
+            lower_ATR = bar.close - band
 
 
         return hl2, jaw, teeth, lips, upper_ATR, lower_ATR
 
     def compute_trend_flag(self):
         """Simpler trend check ."""
+        w = self.trend_window
         return is_trending_ema(
-            self.hl2s[-20:], 
-            self.lips_list[-20:], 
-            self.teeth_list[-20:],
+            self.hl2s.tail(w),
+            self.lips_list.tail(w),
+            self.teeth_list.tail(w),
             slope_threshold=self.slope_threshold)
 
 
@@ -305,9 +508,8 @@ class AlligatorStopLossQC(QCAlgorithm):
         """Block if HL2 is more than X% above lips."""
         if self.lips_price_gap_pct < 0:  # bypass if negative pct is defined
             return True
-        gap = 1.0 + 0.01 * float(self.lips_price_gap_pct)
-        ok = not (lips_val * gap < hl2)
-        if not ok:
+        ok = hl2 <= lips_val * self._lips_gap_mult
+        if not ok and self.enable_logs:
             self.log(f"{self.time} - Blocked: HL2 is more than {self.lips_price_gap_pct:.1f}% above lips "
                      f"(hl2={hl2:.2f}, lips={lips_val:.2f})")
         return ok
@@ -327,9 +529,7 @@ class AlligatorStopLossQC(QCAlgorithm):
         if len(self.hl2s) < lb:
             return False
 
-        window = self.hl2s[-lb:]
-        sma = float(np.mean(window))
-        std = float(np.std(window))
+        sma, std = self.hl2s.window_mean_std()
         if std == 0.0:
             return True
 
@@ -346,7 +546,8 @@ class AlligatorStopLossQC(QCAlgorithm):
             self.wait_peak_check  = True
             self.peak_day_hl2     = hl2
             self.peak_check_days  = 0
-            self.log(f"{self.time} - Price expensive (z={z:.2f}); waiting up to {self.max_peak_days} days to confirm peak")
+            if self.enable_logs:
+                self.log(f"{self.time} - Price expensive (z={z:.2f}); waiting up to {self.max_peak_days} days to confirm peak")
             return False
 
         # Already waiting: strict rollover check
@@ -355,7 +556,8 @@ class AlligatorStopLossQC(QCAlgorithm):
 
             # Rollover (reversal) confirmed
             if self.peak_day_hl2 is not None and hl2 < self.peak_day_hl2:
-                self.log(f"{self.time} - Peak confirmed on day {self.peak_check_days} → blocking entry")
+                if self.enable_logs:
+                    self.log(f"{self.time} - Peak confirmed on day {self.peak_check_days} → blocking entry")
                 self.wait_peak_check = False
                 self.peak_day_hl2 = None
                 self.peak_check_days = 0
@@ -363,14 +565,16 @@ class AlligatorStopLossQC(QCAlgorithm):
 
             # If max days pass with no rollover => allow entry
             if self.peak_check_days >= self.max_peak_days:
-                self.log(f"{self.time} - No peak confirmed in {self.max_peak_days} days → allowing entry")
+                if self.enable_logs:
+                    self.log(f"{self.time} - No peak confirmed in {self.max_peak_days} days → allowing entry")
                 self.wait_peak_check = False
                 self.peak_day_hl2 = None
                 self.peak_check_days = 0
                 return True
 
             # Still waiting
-            self.log(f"{self.time} - Day {self.peak_check_days}: still waiting for peak confirmation")
+            if self.enable_logs:
+                self.log(f"{self.time} - Day {self.peak_check_days}: still waiting for peak confirmation")
             return False
 
         # Neutral
@@ -385,22 +589,25 @@ class AlligatorStopLossQC(QCAlgorithm):
             return False
 
 
+        # the *_prev values are assigned together, so one None check covers all of them
+        lips_prev, teeth_prev = self.lips_prev, self.teeth_prev
+        if lips_prev is None:
+            lips_prev = teeth_prev = float("nan")
+        action = _entry_decision(self.startup_check and not self.portfolio.invested,
+                                 lips_prev, teeth_prev, lips, teeth)
+
         # fixed Startup catch-up (only once ever): only checking trend up
-        if self.startup_check and jaw is not None and teeth is not None and lips is not None:
-            if not self.portfolio.invested:
-                self.buy_act(bar, "startup trending condition")
-                # lets try and find trend all the time, so i am commenting the next command
-                # self.startup_check = False  # only once ever
-                self.wait_peak_check = False
+        if action == ENTRY_STARTUP:
+            self.buy_act(bar, "startup trending condition")
+            # lets try and find trend all the time, so i am commenting the next command
+            # self.startup_check = False  # only once ever
+            self.wait_peak_check = False
 
-                return True
+            return True
 
 
         # Normal cross entry: Lips cross above Teeth (from below)
-        lips_cross_up = (self.lips_prev is not None and self.teeth_prev is not None
-                         and self.lips_prev <= self.teeth_prev and lips > teeth)
-
-        if lips_cross_up:
+        if action == ENTRY_CROSS:
             if self.lips_price_gap_ok(lips, hl2) and self.entry_price_filter(bar, hl2):
                 self.buy_act(bar, "cross + filter")
                 self.wait_peak_check = False
@@ -408,25 +615,21 @@ class AlligatorStopLossQC(QCAlgorithm):
                 return True
 
 
-    def check_exit(self, bar, jaw, teeth, lips):
+    def check_exit(self, bar, jaw, teeth, lips, atr_val):
         """Unified exit logic: trailing stop, hard stop, and cross exits."""
         if self.entryPrice is None:
             return
 
         price = bar.Close
 
-        # Trailing high update
-        if self.highestPrice is None or price > self.highestPrice:
-            self.highestPrice = price
-
         # # 1) Trailing stop
-        # if price <= self.highestPrice * (1 - self.trailingStopPct):
+        # if price <= self.highestPrice * self._trail_mult:
         #     self.sell_act(bar, f"trailing stop {int(self.trailingStopPct*100)}% from {self.highestPrice:.2f}")
         #     self.wait_peak_check = True
         #     return
 
         # # 2) Hard stop from entry
-        # if price <= self.entryPrice * (1 - self.stopLossPct):
+        # if price <= self.entryPrice * self._stop_mult:
         #     self.sell_act(bar, f"hard stop {int(self.stopLossPct*100)}% from entry {self.entryPrice:.2f}")
         #     self.wait_peak_check = True
         #     return
@@ -441,35 +644,36 @@ class AlligatorStopLossQC(QCAlgorithm):
         #     self.wait_peak_check = True
         #     return
 
-        # 4) Lips cross below Jaw
-        lips_below_jaw = (
-            self.lips_prev is not None and self.jaw_prev is not None and
-            self.lips_prev >= self.jaw_prev and lips < jaw
-        )
-        if lips_below_jaw:
+        # Trailing high update, 4) lips cross below jaw and 5) ATR stop
+        # (OnData only runs once the ATR is ready) are evaluated in one kernel call
+        nan = float("nan")
+        lips_prev, jaw_prev = self.lips_prev, self.jaw_prev
+        if lips_prev is None:
+            lips_prev = jaw_prev = nan
+        highest = self.highestPrice
+        action, self.highestPrice = _exit_decision(price, nan if highest is None else highest,
+                                                   lips_prev, jaw_prev, lips, jaw,
+                                                   atr_val, self.atr_multiplier)
+
+        if action == EXIT_CROSS:
             self.sell_act(bar, "lips crossed below jaw")
             self.wait_peak_check = True
-            return
-
-
-        # 5) ATR Exit condition
-        if self.atr_sl_ind.IsReady:
-            atr_stop = self.highestPrice - self.atr_multiplier * self.atr_sl_ind.Current.Value
-            if price <= atr_stop:
-                self.sell_act(bar, f"ATR stop {self.atr_multiplier}xATR below highest {self.highestPrice:.2f} entry: {self.entryPrice:.2f}")
-                self.highestPrice = None
-                return
+        elif action == EXIT_ATR:
+            self.sell_act(bar, f"ATR stop {self.atr_multiplier}xATR below highest {self.highestPrice:.2f} entry: {self.entryPrice:.2f}")
 
     # ---------- Main Bar Handler ----------
+    # OnData dispatches to _on_data, which starts as the warm-up handler and is
+    # swapped for the steady-state one once the ATR and the buffers are ready
+    # (both stay ready), so later bars skip the warm-up checks
     def OnData(self, data):
-        # ---------- basic guards ----------
-        if not data.ContainsKey(self.chosen_symbol):
-            return
+        self._on_data(data)
 
-        if not self.atr_sl_ind.IsReady:
+    def _on_data_warmup(self, data):
+        # ---------- basic guards ----------
+        if not self._atr.IsReady:
             return
 
-        bar = data[self.chosen_symbol]
+        bar = data.bars.get(self.chosen_symbol)
         if bar is None:
             return
 
@@ -480,54 +684,71 @@ class AlligatorStopLossQC(QCAlgorithm):
             # still warming up SMMA / buffers
             # self.log(f"{self.time} - Warming up: collected {len(self.hl2s)} hl2 values")
             return
-        if len(self.hl2s) == 20: # TODO: plug in here the window size global replacing 20
-            self.log(f"{self.time} - Warm up done : collected {len(self.hl2s)} hl2 values")
-
-        if hl2 is not None:
-            # ---------- plot price & alligator lines ----------
-            symbol_price = self.securities[self.chosen_symbol].price
-            self.plot(f"{self.ticker_str} Alligator", self.ticker_str, symbol_price)
-            self.plot(f"{self.ticker_str} Alligator", "Jaw",   jaw)
-            self.plot(f"{self.ticker_str} Alligator", "Teeth", teeth)
-            self.plot(f"{self.ticker_str} Alligator", "Lips",  lips)
-            # if upper_ATR is not None and lower_ATR is not None: 
-            # (but here it is consolidated with the previous if by design)
+        if self.enable_logs:
+            self.log(f"{self.time} - Warm up done : collected {self.hl2s.count} hl2 values")
+        self._on_data = self._on_data_live
+        self._on_bar(bar, hl2, jaw, teeth, lips, upper_ATR, lower_ATR)
+
+    def _on_data_live(self, data):
+        bar = data.bars.get(self.chosen_symbol)
+        if bar is None:
+            return
+
+        hl2 = (bar.high + bar.low) / 2.0
+        self.hl2s.push(hl2)
+        self._on_bar(bar, hl2, *self._update_lines(bar, hl2))
+
+    def _on_bar(self, bar, hl2, jaw, teeth, lips, upper_ATR, lower_ATR):
+        atr_val = self._atr.Current.Value
+
+        # ---------- plot price & alligator lines ----------
+        if self.enable_charts:
+            self._plot_i += 1
+            self._plot_due = self._plot_i % self._plot_every == 0
+        if self._plot_due:
+            plot, ticker = self._plot, self.ticker_str
+            symbol_price = self._security.price
+            plot(self._alligator_chart, ticker, symbol_price)
+            plot(self._alligator_chart, "Jaw",   jaw)
+            plot(self._alligator_chart, "Teeth", teeth)
+            plot(self._alligator_chart, "Lips",  lips)
             #------------plot AvegrageTrueRange --------------------------
-            symbol_price = self.securities[self.chosen_symbol].price
-            self.plot(f"{self.ticker_str} Average True Range from Price", self.ticker_str, symbol_price)
-            self.plot(f"{self.ticker_str} Average True Range from Price", "upper_ATR"    , upper_ATR   )
-            self.plot(f"{self.ticker_str} Average True Range from Price", "lower_ATR"    , lower_ATR   )
+            plot(self._atr_chart, ticker, symbol_price)
+            plot(self._atr_chart, "upper_ATR"    , upper_ATR   )
+            plot(self._atr_chart, "lower_ATR"    , lower_ATR   )
 
 
         # ---------- Entry / Exit decision ----------
         if not self.portfolio.invested:
             # Before calling check_entry, print the key filter values so you can see them in logs
-            try:
-                # z-score diagnostic if enough lookback
-                lb = int(getattr(self, "price_filter_lookback", 0))
-                if len(self.hl2s) >= lb and lb > 0:
-                    window = self.hl2s[-lb:]
-                    sma = float(np.mean(window))
-                    std = float(np.std(window))
-                    hl2_now = hl2
-                    z = (hl2_now - sma) / std if std != 0 else float("nan")
-                    # self.log(f"{self.time} - Z-score check: z={z:.2f} (k={self.price_filter_k})")
-            except Exception as _e:
-                self.log("encountered the exception in Z score calculation")
-                # safe guard — don't crash OnData for logging
-                pass
+            # z-score diagnostic if enough lookback (std == 0 is handled, nothing here can raise)
+            z = float("nan")
+            lb = int(self.price_filter_lookback)
+            if len(self.hl2s) >= lb and lb > 0:
+                sma, std = self.hl2s.window_mean_std()
+                hl2_now = hl2
+                z = (hl2_now - sma) / std if std != 0 else float("nan")
+                if self._diag:
+                    z_ref = float(zscore(self.hl2s.tail(lb))[-1])
+                    if not np.isclose(z, z_ref, equal_nan=True):
+                        self.log(f"{self.time} - Z-score drift: running={z:.6f} scipy={z_ref:.6f}")
+                # self.log(f"{self.time} - Z-score check: z={z:.2f} (k={self.price_filter_k})")
 
             # call your existing entry routine (which enforces startup_once behavior)
-            if self.check_entry(bar, hl2, jaw, teeth, lips):
+            if self.check_entry(bar, hl2, jaw, teeth, lips) and self.enable_logs:
                 self.log(f"{self.time} - Z-score check: z={z:.2f} (k={self.price_filter_k})")
 
         else:
             # invested -> unified exit logic
             if self.cooldown_days_remaining == 0:
-                self.check_exit(bar, jaw, teeth, lips)
+                self.check_exit(bar, jaw, teeth, lips, atr_val)
 
         # ---------- update performance plot & prev values ----------
         self.update_performance(bar)
+        if self.enable_charts:
+            self._chart_flush_i += 1
+            if self._chart_flush_i % self._chart_flush_every == 0:
+                self._flush_charts()
         # keep previous alligator values for cross detection
         self.jaw_prev, self.teeth_prev, self.lips_prev = jaw, teeth, lips
 
@@ -40,7 +40,10 @@ class CompetitionAlgorithm(QCAlgorithm):
         #self.SetBrokerageModel(BrokerageName.InteractiveBrokersBrokerage, AccountType.Margin)
 
         
-        self.spy = self.add_equity("SPY", Resolution.MINUTE).Symbol
+        # keep the security and holding handles so the scheduled handlers skip the dictionary lookups
+        self._spy_security = self.add_equity("SPY", Resolution.MINUTE)
+        self.spy = self._spy_security.Symbol
+        self._spy_holding = self.Portfolio[self.spy]
         self.position_open = False
         self.spy_buffer = 500  # keep $500 uninvested to avoid overcommitting
 
@@ -65,8 +68,8 @@ class CompetitionAlgorithm(QCAlgorithm):
             return
         if not self.CurrentSlice.ContainsKey(self.spy):
             return
-        if not self.Portfolio[self.spy].Invested:
-            price = self.Securities[self.spy].Price
+        if not self._spy_holding.Invested:
+            price = self._spy_security.Price
             cash = self.Portfolio.Cash
             cash_to_use = cash - self.spy_buffer
             quantity = int(cash_to_use / price)
@@ -82,7 +85,7 @@ class CompetitionAlgorithm(QCAlgorithm):
             return
         if not self.CurrentSlice.ContainsKey(self.spy):
             return
-        if self.Portfolio[self.spy].Invested:
+        if self._spy_holding.Invested:
             self.Liquidate(self.spy)
             self.Debug(f"SELL {self.spy} at open: {self.Time}")
 
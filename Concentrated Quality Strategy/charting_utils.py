@@ -10,11 +10,15 @@ class ChartingManager:
     
     def __init__(self, algorithm):
         self.algorithm = algorithm
-        self.equity_history = []
-        self.benchmark_history = []
-        self.dates = []
         self.initial_equity = None
         self.initial_benchmark = None
+        # Only the latest values, running peaks and a point count are kept;
+        # the chart series already hold every plotted point
+        self._current_equity = None
+        self._current_bench = None
+        self._points = 0
+        self._equity_peak = float('-inf')
+        self._benchmark_peak = float('-inf')
         
         # Initialize charts
         self.setup_charts()
@@ -53,10 +57,12 @@ class ChartingManager:
             if self.initial_equity == 0 or self.initial_benchmark == 0:
                 return
             
-            # Store history
-            self.equity_history.append(current_equity)
-            self.benchmark_history.append(current_benchmark)
-            self.dates.append(self.algorithm.time)
+            # Store latest values
+            self._current_equity = current_equity
+            self._current_bench = current_benchmark
+            self._points += 1
+            self._equity_peak = max(self._equity_peak, current_equity)
+            self._benchmark_peak = max(self._benchmark_peak, current_benchmark)
             
             # Calculate normalized values (base 100)
             normalized_equity = (current_equity / self.initial_equity) * 100
@@ -75,14 +81,14 @@ class ChartingManager:
     def update_drawdown_chart(self):
         """Update drawdown chart with both strategy and benchmark drawdowns"""
         try:
-            if len(self.equity_history) < 2:
+            if self._points < 2:
                 return
             
             # Calculate strategy drawdown
-            strategy_drawdown = self.calculate_drawdown(self.equity_history)
+            strategy_drawdown = self.calculate_drawdown(self._current_equity, self._equity_peak)
             
             # Calculate benchmark drawdown
-            benchmark_drawdown = self.calculate_drawdown(self.benchmark_history)
+            benchmark_drawdown = self.calculate_drawdown(self._current_bench, self._benchmark_peak)
             
             # Update drawdown chart
             self.strategy_drawdown_series.add_point(self.algorithm.time, strategy_drawdown)
@@ -91,16 +97,9 @@ class ChartingManager:
         except Exception as e:
             self.algorithm.log(f"Error updating drawdown chart: {str(e)}")
     
-    def calculate_drawdown(self, price_history):
-        """Calculate current drawdown from peak"""
+    def calculate_drawdown(self, current, peak):
+        """Calculate current drawdown from the running peak"""
         try:
-            if not price_history:
-                return 0.0
-            
-            # Find peak value
-            peak = max(price_history)
-            current = price_history[-1]
-            
             # Calculate drawdown percentage
             drawdown = ((current - peak) / peak) * 100
             return drawdown
@@ -112,16 +111,16 @@ class ChartingManager:
     def log_performance_summary(self):
         """Log a summary of current performance vs benchmark"""
         try:
-            if len(self.equity_history) < 2:
+            if self._points < 2:
                 return
             
             # Calculate returns
-            strategy_return = ((self.equity_history[-1] / self.initial_equity) - 1) * 100
-            benchmark_return = ((self.benchmark_history[-1] / self.initial_benchmark) - 1) * 100
+            strategy_return = ((self._current_equity / self.initial_equity) - 1) * 100
+            benchmark_return = ((self._current_bench / self.initial_benchmark) - 1) * 100
             
             # Calculate current drawdowns
-            strategy_drawdown = self.calculate_drawdown(self.equity_history)
-            benchmark_drawdown = self.calculate_drawdown(self.benchmark_history)
+            strategy_drawdown = self.calculate_drawdown(self._current_equity, self._equity_peak)
+            benchmark_drawdown = self.calculate_drawdown(self._current_bench, self._benchmark_peak)
             
             # Calculate excess return
             excess_return = strategy_return - benchmark_return
@@ -140,13 +139,13 @@ class ChartingManager:
     def get_performance_metrics(self):
         """Get current performance metrics as dictionary"""
         try:
-            if len(self.equity_history) < 2:
+            if self._points < 2:
                 return {}
             
-            strategy_return = ((self.equity_history[-1] / self.initial_equity) - 1) * 100
-            benchmark_return = ((self.benchmark_history[-1] / self.initial_benchmark) - 1) * 100
-            strategy_drawdown = self.calculate_drawdown(self.equity_history)
-            benchmark_drawdown = self.calculate_drawdown(self.benchmark_history)
+            strategy_return = ((self._current_equity / self.initial_equity) - 1) * 100
+            benchmark_return = ((self._current_bench / self.initial_benchmark) - 1) * 100
+            strategy_drawdown = self.calculate_drawdown(self._current_equity, self._equity_peak)
+            benchmark_drawdown = self.calculate_drawdown(self._current_bench, self._benchmark_peak)
             excess_return = strategy_return - benchmark_return
             
             return {
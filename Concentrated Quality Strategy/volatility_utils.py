@@ -5,19 +5,47 @@ Contains functions for market regime detection and volatility-based position siz
 
 from AlgorithmImports import *
 import numpy as np
+from enum import IntEnum
 from utils import StrategyConfig
 
+class Regime(IntEnum):
+    """Market regimes returned by detect_market_regime"""
+    UNKNOWN = 0
+    BULL = 1
+    BEAR = 2
+    SIDEWAYS = 3
+    HIGH_VOLATILITY = 4
+
+# Regime per (date, symbol, lookback): position sizing and rotation both ask
+# for it on the same day, and each miss costs a history request
+_REGIME_CACHE = {}
+
 def detect_market_regime(algorithm, spy_symbol, lookback_days=20):
     """
     Detect current market regime to adjust strategy accordingly
-    Returns: 'bull', 'bear', 'sideways', 'high_volatility'
+    Returns: Regime.BULL, BEAR, SIDEWAYS, HIGH_VOLATILITY (or UNKNOWN)
+    Result is cached for the rest of the trading day
     """
+    today = algorithm.time.date()
+    key = (today, spy_symbol, lookback_days)
+    hit = _REGIME_CACHE.get(key)
+    if hit is not None:
+        return hit
+    regime = _compute_market_regime(algorithm, spy_symbol, lookback_days)
+    # Only today's entries can be hit again
+    if any(k[0] != today for k in _REGIME_CACHE):
+        _REGIME_CACHE.clear()
+    _REGIME_CACHE[key] = regime
+    return regime
+
+def _compute_market_regime(algorithm, spy_symbol, lookback_days):
+    """Uncached regime detection from SPY daily history"""
     try:
         # Get SPY history
         history = algorithm.history(spy_symbol, lookback_days, Resolution.DAILY)
         
         if history is None or history.empty or len(history) < lookback_days:
-            return 'unknown'
+            return Regime.UNKNOWN
         
         closes = history['close'].values
         
@@ -27,26 +55,28 @@ def detect_market_regime(algorithm, spy_symbol, lookback_days=20):
         # Calculate volatility (standard deviation of returns)
         volatility = np.std(returns) * np.sqrt(252)  # Annualized
         
-        # Calculate trend (simple linear regression slope)
-        x = np.arange(len(closes))
-        slope = np.polyfit(x, closes, 1)[0]
+        # Calculate trend (least-squares slope against x = 0..n-1, closed form:
+        # sum((x - x_mean) * y) / sum((x - x_mean)^2) with sum((x - x_mean)^2) = n(n^2-1)/12)
+        n = len(closes)
+        x_centered = np.arange(n) - (n - 1) / 2.0
+        slope = x_centered @ closes / (n * (n * n - 1) / 12.0)
         
         # Calculate trend strength
         trend_strength = slope / closes[0] * 252  # Annualized trend
         
         # Determine regime
         if volatility > 0.25:  # High volatility (>25% annualized)
-            return 'high_volatility'
+            return Regime.HIGH_VOLATILITY
         elif trend_strength > 0.1:  # Strong uptrend (>10% annualized)
-            return 'bull'
+            return Regime.BULL
         elif trend_strength < -0.1:  # Strong downtrend (<-10% annualized)
-            return 'bear'
+            return Regime.BEAR
         else:
-            return 'sideways'
+            return Regime.SIDEWAYS
             
     except Exception as e:
         algorithm.log(f"Error detecting market regime: {str(e)}")
-        return 'unknown'
+        return Regime.UNKNOWN
 
 def calculate_volatility_adjusted_position_size(algorithm, base_position_size, spy_symbol):
     """
@@ -55,15 +85,15 @@ def calculate_volatility_adjusted_position_size(algorithm, base_position_size, s
     try:
         market_regime = detect_market_regime(algorithm, spy_symbol)
         
-        if market_regime == 'high_volatility':
+        if market_regime is Regime.HIGH_VOLATILITY:
             # Reduce position sizes during high volatility
             adjusted_size = base_position_size * StrategyConfig.HIGH_VOLATILITY_REDUCTION
             algorithm.log(f"High volatility detected - reducing position sizes by {StrategyConfig.HIGH_VOLATILITY_REDUCTION:.0%}")
-        elif market_regime == 'bear':
+        elif market_regime is Regime.BEAR:
             # Further reduce in bear markets
             adjusted_size = base_position_size * 0.3
             algorithm.log(f"Bear market detected - reducing position sizes to 30%")
-        elif market_regime == 'sideways':
+        elif market_regime is Regime.SIDEWAYS:
             # In sideways markets, maintain normal position sizes but force more rotation
             adjusted_size = base_position_size
             algorithm.log(f"Sideways market detected - maintaining position sizes but forcing rotation")
@@ -84,9 +114,9 @@ def should_force_rotation(algorithm, spy_symbol):
         market_regime = detect_market_regime(algorithm, spy_symbol)
         
         # Force more aggressive rotation in sideways markets
-        if market_regime == 'sideways':
+        if market_regime is Regime.SIDEWAYS:
             return True
-        elif market_regime == 'high_volatility':
+        elif market_regime is Regime.HIGH_VOLATILITY:
             return True  # Also rotate more in volatile markets
         else:
             return False
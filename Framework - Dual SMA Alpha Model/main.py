@@ -1,67 +1,81 @@
 # region imports
 from AlgorithmImports import *
 from datetime import timedelta
+import numpy as np
 from QuantConnect import Chart, Series, SeriesType
 # endregion
 
 # Momentum based alphe model
 # the Alpha Model's Job - is to simply produce predictions
 class MOMAlphaModel(AlphaModel):
+    # insight period, built once instead of on every Update
+    _INSIGHT_PERIOD = timedelta(1)
+
     def __init__(self):
-        self.mom = []
+        # parallel lists: symbols[i] is tracked by indicators[i]
+        self.symbols = []
+        self.indicators = []
 
     def OnSecuritiesChanged(self, algorithm, changes):
         # 1 initialize a 14 - day momentum indicator
         for security in changes.AddedSecurities:
             symbol = security.Symbol
-            self.mom.append({"symbol":symbol, 
-                            "indicator": algorithm.MOM(symbol, 14, Resolution.DAILY)})
+            self.symbols.append(symbol)
+            self.indicators.append(algorithm.MOM(symbol, 14, Resolution.DAILY))
 
     def Update(self, algorithm, data):
-        # 2 sort the list of dictionaries by indicator in descending order
-        ordered = sorted(self.mom, key=lambda kv: kv["indicator"].Current.Value, reverse = True)
+        # 2 rank the current indicator values in descending order
+        values = np.fromiter((indicator.Current.Value for indicator in self.indicators),
+                             dtype=float, count=len(self.indicators))
+        ordered = np.argsort(-values, kind="stable")
 
         # 3 return a group of insights, emitting InsightDirection.Up for the first item of ordered,
         #   and InsightDirection.Flat for the second
         return Insight.group([
             # create a grouped insight
-            Insight.price(ordered[0]['symbol'], timedelta(1), InsightDirection.UP),
-            Insight.price(ordered[1]['symbol'], timedelta(1), InsightDirection.FLAT)])
+            Insight.price(self.symbols[ordered[0]], self._INSIGHT_PERIOD, InsightDirection.UP),
+            Insight.price(self.symbols[ordered[1]], self._INSIGHT_PERIOD, InsightDirection.FLAT)])
 
 
 # SMA based Alpha Model:
 class DualSmaAlphaModel(AlphaModel):
+    # insight periods, built once instead of on every Update
+    _ENTRY_PERIOD = timedelta(days=5)
+    _EXIT_PERIOD = timedelta(1)
+
     def __init__(self, fast_period=2, slow_period=48):
         self.fast_period = fast_period
         self.slow_period = slow_period
         self.symbol_data = {}
+        # (symbol, SymbolData) pairs, rebuilt only when the universe changes
+        self._sd_items = ()
 
     def Update(self, algorithm, data):
         insights = []
 
-        for symbol, sd in self.symbol_data.items():
+        for symbol, sd in self._sd_items:
+            # IsReady covers both SMAs, so the entry condition doesn't re-check them
             if not sd.IsReady:
                 continue
-            
-
-            # Plot price every update
-            sd.PlotPrice()
 
-            price = algorithm.Securities[symbol].Price
+            price = sd.security.Price
             fast = sd.fast.Current.Value
             slow = sd.slow.Current.Value
 
+            # Plot price every update
+            sd.PlotPrice(price)
+
             # Entry condition: SMA(5) crosses above SMA(20)
-            if not sd.invested and fast > slow and sd.fast.IsReady and sd.slow.IsReady:
-                insights.append(Insight.price(symbol, timedelta(days=5), InsightDirection.UP))
+            if not sd.invested and fast > slow:
+                insights.append(Insight.price(symbol, self._ENTRY_PERIOD, InsightDirection.UP))
                 sd.invested = True
-                sd.PlotSignal("buy")
+                sd.PlotSignal("buy", price)
 
             # Exit condition: Price < 90% of SMA(20)
             elif sd.invested and price < 0.9 * slow:
-                insights.append(Insight.price(symbol, timedelta(1), InsightDirection.FLAT))
+                insights.append(Insight.price(symbol, self._EXIT_PERIOD, InsightDirection.FLAT))
                 sd.invested = False
-                sd.PlotSignal("sell")
+                sd.PlotSignal("sell", price)
 
         return insights
 
@@ -76,14 +90,18 @@ class DualSmaAlphaModel(AlphaModel):
             if symbol in self.symbol_data:
                 self.symbol_data.pop(symbol)
 
+        self._sd_items = tuple(self.symbol_data.items())
+
 class SymbolData:
     def __init__(self, algorithm, symbol, fast_period, slow_period):
         self.symbol = symbol
+        self.security = algorithm.Securities[symbol]
         self.fast = algorithm.sma(symbol, fast_period, Resolution.HOUR)
         self.slow = algorithm.sma(symbol, slow_period, Resolution.HOUR)
         self.invested = False
         self.algorithm = algorithm
         self.plot_name = str(symbol)
+        self._last_plot_date = None  # price is plotted at most once per day
         algorithm.plot_indicator(self.plot_name, self.fast, self.slow)
         algorithm.Plot(self.plot_name, "Signal", 0)
 
@@ -91,12 +109,15 @@ class SymbolData:
     def IsReady(self):
         return self.fast.IsReady and self.slow.IsReady
 
-    def PlotPrice(self):
-        price = self.algorithm.Securities[self.symbol].Price
+    def PlotPrice(self, price):
+        # Update runs every bar; one price point per day is enough for the chart
+        today = self.algorithm.Time.date()
+        if today == self._last_plot_date:
+            return
+        self._last_plot_date = today
         self.algorithm.Plot(self.plot_name, "Price", price)
 
-    def PlotSignal(self, signal_type):
-        price = self.algorithm.Securities[self.symbol].Price
+    def PlotSignal(self, signal_type, price):
         if signal_type == "buy":
             self.algorithm.Plot(self.plot_name, "Signal", price)
         elif signal_type == "sell":
@@ -1,31 +1,36 @@
 # region imports
 from AlgorithmImports import *
 from datetime import timedelta
+import numpy as np
 # endregion
 
 # Momentum based alphe model
 # the Alpha Model's Job - is to simply produce predictions
 class MOMAlphaModel(AlphaModel):
     def __init__(self):
-        self.mom = []
+        # parallel lists: symbols[i] is tracked by indicators[i]
+        self.symbols = []
+        self.indicators = []
 
     def OnSecuritiesChanged(self, algorithm, changes):
         # 1 initialize a 14 - day momentum indicator
         for security in changes.AddedSecurities:
             symbol = security.Symbol
-            self.mom.append({"symbol":symbol, 
-                            "indicator": algorithm.MOM(symbol, 14, Resolution.DAILY)})
+            self.symbols.append(symbol)
+            self.indicators.append(algorithm.MOM(symbol, 14, Resolution.DAILY))
 
     def Update(self, algorithm, data):
-        # 2 sort the list of dictionaries by indicator in descending order
-        ordered = sorted(self.mom, key=lambda kv: kv["indicator"].Current.Value, reverse = True)
+        # 2 rank the current indicator values in descending order
+        values = np.fromiter((indicator.Current.Value for indicator in self.indicators),
+                             dtype=float, count=len(self.indicators))
+        ordered = np.argsort(-values, kind="stable")
 
         # 3 return a group of insights, emitting InsightDirection.Up for the first item of ordered,
         #   and InsightDirection.Flat for the second
         return Insight.Group([
             # create a grouped insight
-            Insight.Price(ordered[0]['symbol'], timedelta(1), InsightDirection.UP),
-            Insight.Price(ordered[1]['symbol'], timedelta(1), InsightDirection.FLAT)])
+            Insight.Price(self.symbols[ordered[0]], timedelta(1), InsightDirection.UP),
+            Insight.Price(self.symbols[ordered[1]], timedelta(1), InsightDirection.FLAT)])
 
 
 class FrameworkAlgorithm(QCAlgorithm):
@@ -1,5 +1,8 @@
 # region imports
 from AlgorithmImports import *
+import heapq
+import io
+import numpy as np
 # endregion
 from AlphaModel import *
 
@@ -37,13 +40,17 @@ ________________________________________________________________________________
 
 
 class VerticalTachyonRegulators(QCAlgorithm):
-    _statistics = ["Time,Sharpe,Beta,95VaR, Alpha"]
+    _statistics_header = "Time,Sharpe,Beta,95VaR, Alpha"
 
     def Initialize(self):
         self.SetStartDate(2020, 1, 1)
         self.SetEndDate(2025, 1, 1)
         self.SetCash(100000)
 
+        # Daily statistics rows as numeric tuples, formatted once at the end
+        self._statistics = []
+        self._statistics_date = None
+
         # Universe selection
         self.month = 0
         self.num_coarse = 500
@@ -81,11 +88,11 @@ class VerticalTachyonRegulators(QCAlgorithm):
             return Universe.Unchanged
 
         # Select only those with fundamental data and a sufficiently large price
-        # Sort by top dollar volume: most liquid to least liquid
-        selected = sorted([x for x in coarse if x.HasFundamentalData and x.Price > 5],
-                            key = lambda x: x.DollarVolume, reverse=True)
+        # Top dollar volume: most liquid to least liquid (only num_coarse are kept, no full sort)
+        selected = heapq.nlargest(self.num_coarse, (x for x in coarse if x.HasFundamentalData and x.Price > 5),
+                                  key=lambda x: x.DollarVolume)
 
-        return [x.Symbol for x in selected[:self.num_coarse]]
+        return [x.Symbol for x in selected]
 
 
     def FineSelectionFunction(self, fine):
@@ -109,11 +116,18 @@ class VerticalTachyonRegulators(QCAlgorithm):
 
 
     def on_end_of_day(self, symbol: Symbol) -> None:
+        # Called once per symbol; the portfolio statistics only need one row per day
+        today = self.time.date()
+        if today == self._statistics_date:
+            return
+        self._statistics_date = today
+
         # Obtain the algorithm statistics interested.
-        sharpe = self.statistics.total_performance.portfolio_statistics.sharpe_ratio
-        b = self.statistics.total_performance.portfolio_statistics.beta
-        var = self.statistics.total_performance.portfolio_statistics.value_at_risk_95
-        alpha = self.statistics.total_performance.portfolio_statistics.alpha
+        portfolio_statistics = self.statistics.total_performance.portfolio_statistics
+        sharpe = float(portfolio_statistics.sharpe_ratio)
+        b = float(portfolio_statistics.beta)
+        var = float(portfolio_statistics.value_at_risk_95)
+        alpha = float(portfolio_statistics.alpha)
 
         # Plot the statistics.
         self.plot("Statistics", "Sharpe", sharpe)
@@ -122,8 +136,12 @@ class VerticalTachyonRegulators(QCAlgorithm):
         self.plot("Statistics", "Alpha", alpha)
 
         # Write to save the statistics.
-        self._statistics.append(f'{self.time.strftime("%Y%m%d")},{sharpe},{b},{var},{alpha}')
+        self._statistics.append((today.year * 10000 + today.month * 100 + today.day, sharpe, b, var, alpha))
 
     def on_end_of_algorithm(self) -> None:
-        # Save the logged statistics for later access in the object store.
-        self.object_store.save(f'{self.project_id}/algorithm-statistics', '\n'.join(self._statistics))
+        # Save the logged statistics for later access in the object store
+        # (one formatting pass over the whole table).
+        buffer = io.StringIO()
+        np.savetxt(buffer, np.array(self._statistics, dtype=float).reshape(-1, 5),
+                   fmt="%d,%.6f,%.6f,%.6f,%.6f", header=self._statistics_header, comments="")
+        self.object_store.save(f'{self.project_id}/algorithm-statistics', buffer.getvalue().rstrip("\n"))
@@ -1,6 +1,7 @@
 # region imports
 from AlgorithmImports import *
 from datetime import datetime
+import heapq
 from QuantConnect.Data.UniverseSelection import *
 from Selection.FundamentalUniverseSelectionModel import FundamentalUniverseSelectionModel 
 # endregion
@@ -39,11 +40,12 @@ class LiquidValueUniverseSelectionModel(FundamentalUniverseSelectionModel):
             return Universe.Unchanged
         self.lastMonth = algorithm.Time.month
 
-        # Sort symbols by Dolar value, and if they have fundamental ded, in descending order:
-        sortedByDollarVolume = sorted([x for x in coarse if x.HasFundamentalData],
-        key=lambda x: x.DollarVolume, reverse=True)
+        # Top 100 symbols with fundamental data by Dolar value, in descending order
+        # (nlargest keeps only 100 candidates instead of sorting the whole coarse list):
+        topByDollarVolume = heapq.nlargest(100, (x for x in coarse if x.HasFundamentalData),
+                                           key=lambda x: x.DollarVolume)
 
-        return [x.Symbol for x in sortedByDollarVolume[:100]]
+        return [x.Symbol for x in topByDollarVolume]
 
 
 
@@ -61,6 +63,8 @@ class LiquidValueUniverseSelectionModel(FundamentalUniverseSelectionModel):
 
 # Define the LongShortAlphaModel Class:
 class LongShortEYAlphaModel(AlphaModel):
+    # insight period, built once instead of per security
+    _INSIGHT_PERIOD = timedelta(28)
 
     def __init__(self):
         self.lastMonth = -1
@@ -79,7 +83,7 @@ class LongShortEYAlphaModel(AlphaModel):
         # create for loop to emit insights with insight directions
         for security in algorithm.ActiveSecurities.Values:
             direction = 1 if security.Fundamentals.ValuationRatios.EarningYield > 0 else -1
-            insights.append(Insight.Price(security.Symbol, timedelta(28), direction))
+            insights.append(Insight.Price(security.Symbol, self._INSIGHT_PERIOD, direction))
 
 
 
@@ -1,7 +1,9 @@
 # region imports
 from AlgorithmImports import *
 from datetime import timedelta
+import heapq
 # from sklearn.preprocessing import MinMaxScaler
+import numpy as np
 
 # endregion
 
@@ -16,12 +18,8 @@ def calculate_linear_weights(symbols):
     if n <= 1:
         return [1.0]
 
-    worst_weight = 2.0 / (3.0 * n)
-    best_weight = 2.0 * worst_weight
-    step = (best_weight - worst_weight) / (n - 1)
-    weights = [best_weight - i * step for i in range(n)]
-    total = sum(weights)
-    return [w / total for w in weights]
+    # Arithmetic sequence 2w .. w sums to 1.5 * n * w, so w = 1 / (1.5 * n)
+    return (np.linspace(2.0, 1.0, n) / (1.5 * n)).tolist()
 
 
 class UniverseSelectionAlgorithm(QCAlgorithm):
@@ -66,64 +64,12 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
     def CoarseSelectionFunction(self, coarse):
         filtered = [x for x in coarse if x.HasFundamentalData and x.Price > self.min_price
                     and x.DollarVolume > self.min_volume and x.Market == Market.USA]
-        sorted_by_volume = sorted(filtered, key=lambda x: x.DollarVolume, reverse=True)
-        return [x.Symbol for x in sorted_by_volume[:500]]
+        return [x.Symbol for x in heapq.nlargest(500, filtered, key=lambda x: x.DollarVolume)]
 
     def FineSelectionFunction(self, fine):
-        filtered = []
-        for f in fine:
-            if f.MarketCap < self.min_market_cap:
-                continue
-
-            pe = f.ValuationRatios.PERatio
-            if pe is None or pe <= self.pe_ratio_min:
-                continue
-
-            equity = f.FinancialStatements.BalanceSheet.TotalEquity.Value
-            debt = f.FinancialStatements.BalanceSheet.TotalDebt.Value
-            if equity <= 0:
-                continue
-            d2e = debt / equity
-            if d2e > self.debt_to_equity_max:
-                continue
-
-            roe = f.OperationRatios.ROE.OneYear
-            if roe is None or roe < self.roe_min:
-                continue
-
-            if f.OperationRatios.RevenueGrowth.OneYear < 0:
-                continue
-
-            liabilities = f.FinancialStatements.BalanceSheet.CurrentLiabilities.Value
-            assets = f.FinancialStatements.BalanceSheet.CurrentAssets.Value
-            if liabilities <= 0 or (assets / liabilities) < 1.0:
-                continue
-
-            filtered.append(f)
-
-        scored = []
-        for f in filtered:
-            roe = f.OperationRatios.ROE.OneYear
-            pe = f.ValuationRatios.PERatio
-            rev_growth = f.OperationRatios.RevenueGrowth.OneYear
-
-            equity = f.FinancialStatements.BalanceSheet.TotalEquity.Value
-            debt = f.FinancialStatements.BalanceSheet.TotalDebt.Value
-            d2e = debt / equity if equity > 0 else 1
-
-            if None in [roe, pe, rev_growth] or pe <= 0:
-                continue
-
-            score = (
-                0.3 * roe +
-                0.3 * rev_growth +
-                0.2 * (1 / pe) +
-                0.2 * (1 / (1 + d2e))
-            )
-            scored.append((f, score))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
-        top = [x[0].Symbol for x in scored[:10]]
+        # Filter, score and top-k in one lazy pass: no intermediate lists
+        scored = (s for s in map(self._score_fine, fine) if s is not None)
+        top = [f.Symbol for f, _ in heapq.nlargest(10, scored, key=lambda x: x[1])]
 
         if top:
             self.Debug(f"Selected {len(top)} stocks")
@@ -131,6 +77,49 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
             self.Debug(f"Selected: {top}")
         return top
 
+    def _score_fine(self, f):
+        """(fine, score) for a stock passing every screen, None otherwise."""
+        # Values read for the filters are reused for the score, so each
+        # fundamental is fetched from the bridge only once
+        if f.MarketCap < self.min_market_cap:
+            return None
+
+        # Cheapest rejections first; the balance sheet chain is walked last
+        pe = f.ValuationRatios.PERatio
+        if pe is None or pe <= self.pe_ratio_min:
+            return None
+
+        op = f.OperationRatios
+        roe = op.ROE.OneYear
+        if roe is None or roe < self.roe_min:
+            return None
+
+        rev_growth = op.RevenueGrowth.OneYear
+        if rev_growth < 0:
+            return None
+
+        # Ratio screens are cross-multiplied (denominators are positive), so
+        # no divide is spent on a stock that gets rejected
+        bs = f.FinancialStatements.BalanceSheet
+        liabilities = bs.CurrentLiabilities.Value
+        if liabilities <= 0 or bs.CurrentAssets.Value < liabilities:
+            return None
+
+        equity = bs.TotalEquity.Value
+        if equity <= 0:
+            return None
+        debt = bs.TotalDebt.Value
+        if debt > self.debt_to_equity_max * equity:
+            return None
+
+        # 1 / (1 + debt / equity) == equity / (equity + debt): two divides total
+        score = (
+            0.3 * (roe + rev_growth) +
+            0.2 / pe +
+            0.2 * equity / (equity + debt)
+        )
+        return f, score
+
     def OnSecuritiesChanged(self, changes):
         for security in changes.RemovedSecurities:
             self.Debug(f"Removed: {security.Symbol}")
@@ -165,14 +154,19 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
 
         symbol = orderEvent.Symbol
 
-        if symbol in self.entryTickets and self.entryTickets[symbol].OrderId == orderEvent.OrderId:
-            stop_price = (1-self.stop_loss)* self.entryTickets[symbol].AverageFillPrice
-            self.stopMarketTickets[symbol] = self.StopMarketOrder(symbol, -self.entryTickets[symbol].Quantity, stop_price)
-            self.highestPrices[symbol] = self.entryTickets[symbol].AverageFillPrice
+        # Fetch each ticket once; it is only removed when this fill is its order
+        ticket = self.entryTickets.get(symbol)
+        if ticket is not None and ticket.OrderId == orderEvent.OrderId:
+            fill_price = ticket.AverageFillPrice
+            stop_price = (1-self.stop_loss)* fill_price
+            self.stopMarketTickets[symbol] = self.StopMarketOrder(symbol, -ticket.Quantity, stop_price)
+            self.highestPrices[symbol] = fill_price
             # self.Debug(f"Placed stop loss for {symbol} at {stop_price:.2f}")
             del self.entryTickets[symbol]
+            return
 
-        elif symbol in self.stopMarketTickets and self.stopMarketTickets[symbol].OrderId == orderEvent.OrderId:
+        ticket = self.stopMarketTickets.get(symbol)
+        if ticket is not None and ticket.OrderId == orderEvent.OrderId:
             self.stopMarketOrderFillTimes[symbol] = self.Time
             self.highestPrices[symbol] = 0
             del self.stopMarketTickets[symbol]
@@ -183,16 +177,16 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
             if self.IsWarmingUp:
                 return  # Don't process trades during warmup
 
-            symbols = list(self.ActiveSecurities.Keys)
+            # Materialize the active set once per bar and walk it in a single pass
+            symbols = tuple(self.ActiveSecurities.Keys)
             for symbol in symbols:
-                if symbol not in data or not data[symbol]:
+                if symbol not in data:
+                    continue
+                bar = data[symbol]
+                if not bar:
                     continue
-                symbols = list(self.ActiveSecurities.Keys)
-                for symbol in symbols:
-                    if symbol not in data or not data[symbol]:
-                        continue
 
-                price = data[symbol].Price
+                price = bar.Price
 
                 if symbol not in self.stopMarketOrderFillTimes:
                     self.stopMarketOrderFillTimes[symbol] = self.Time - timedelta(days=31)
@@ -29,13 +29,16 @@
 #  *Adjust them consciously to keep the intended factor mix.*
 # ---------------------------------------------------------------------
 from AlgorithmImports import *
+import math
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve
 from datetime import timedelta
 
 import scipy.cluster.hierarchy as sch
 from scipy.spatial.distance import squareform
+from numba_utils import njit, prange
 
 TRADING_DAYS_PER_MONTH      = 21
 LOOKBACK_DAYS               = TRADING_DAYS_PER_MONTH // 2   # ← momentum / alpha horizon
@@ -44,28 +47,128 @@ BETA_REG_WINDOW             = TRADING_DAYS_PER_MONTH        # the minimum number
 TRADING_DAYS_PER_YEAR       = TRADING_DAYS_PER_MONTH*12
 UNIVERSE_REFRESH_DAYS       = 30
 
+def _widen(arr, width, fill):
+    """Copy of `arr` with its last (symbol) axis grown to `width`, new slots set to `fill`."""
+    out = np.full(arr.shape[:-1] + (width,), fill, dtype=arr.dtype)
+    out[..., :arr.shape[-1]] = arr
+    return out
+
+def _shrink_cov_constant_corr(X):
+    """
+    Ledoit-Wolf (2004) covariance of returns X (T × N), shrunk toward a
+    constant-correlation target with the optimal intensity. Stabilises Σ
+    when N is not small against T.
+    """
+    T, N   = X.shape
+    Xc     = X - X.mean(axis=0)
+    S      = Xc.T @ Xc / T
+    var    = np.diag(S).copy()
+    sd     = np.sqrt(var)
+    sd[sd == 0] = 1.0                                   # flat series: keep the division finite
+    r_bar  = ((S / np.outer(sd, sd)).sum() - N) / (N * (N - 1))
+    F      = r_bar * np.outer(sd, sd)
+    np.fill_diagonal(F, var)
+
+    # π: asymptotic variances of the entries of S; ρ: their covariance with F
+    pi_mat = (Xc ** 2).T @ (Xc ** 2) / T - S ** 2
+    theta  = (Xc ** 3).T @ Xc / T - var[:, None] * S
+    np.fill_diagonal(theta, 0.0)
+    rho    = np.trace(pi_mat) + r_bar * ((sd[None, :] / sd[:, None]) * theta).sum()
+    gamma  = ((S - F) ** 2).sum()
+    delta  = 0.0 if gamma == 0 else min(1.0, max(0.0, (pi_mat.sum() - rho) / gamma / T))
+    return delta * F + (1.0 - delta) * S
+
+# ======================  NUMBA KERNELS  ==============================
+# No fastmath: gaps in the matrices are NaN and are skipped by the r == r test
+@njit(parallel=True, cache=True)
+def _one_month_kernel(hist, buf, n_buf, out, window):
+    """
+    out[j] = sum of the last `window` log-returns of column j, reading the
+    diffs of the first n_buf buffered log-prices (newest first) and then
+    the committed history hist (T × N) backwards. NaN gaps count as 0.
+    """
+    T = hist.shape[0]
+    for j in prange(hist.shape[1]):
+        s    = 0.0
+        left = window
+        k    = n_buf - 1
+        while k > 0 and left > 0:
+            r = buf[k, j] - buf[k - 1, j]
+            if r == r:
+                s += r
+            k    -= 1
+            left -= 1
+        t = T - 1
+        while t >= 0 and left > 0:
+            r = hist[t, j]
+            if r == r:
+                s += r
+            t    -= 1
+            left -= 1
+        out[j] = s
+
+@njit(parallel=True, cache=True)
+def _capm_kernel(R, x_all, cols, denom, x_mean, n_x, shrink_w, target_beta, min_obs,
+                 betas, intercepts):
+    """
+    CAPM OLS of every column j in `cols` of R (T × N) on the market returns
+    x_all, over the rows where x_all is known (missing y counts as 0):
+        β  = (1-w)·Σxy/denom + w·target,   α₀ = mean(y) - β·mean(x)
+    written to betas[j] / intercepts[j] only if column j has ≥ min_obs returns.
+    """
+    T = R.shape[0]
+    for i in prange(cols.shape[0]):
+        j     = cols[i]
+        sxy   = 0.0
+        sy    = 0.0
+        n_obs = 0
+        for t in range(T):
+            y = R[t, j]
+            if y == y:
+                n_obs += 1
+                x = x_all[t]
+                if x == x:
+                    sxy += x * y
+                    sy  += y
+        if n_obs < min_obs:
+            continue
+        beta          = (1.0 - shrink_w) * (sxy / denom) + shrink_w * target_beta
+        betas[j]      = beta
+        intercepts[j] = sy / n_x - beta * x_mean
+
 # ======================  PER-SYMBOL STATE  ===========================
 class SymbolData:
-    """Cache of rolling returns and factor-model parameters."""
-    def __init__(self, symbol, log_returns: pd.Series):
+    """
+    Per-symbol view of the owner's SoA store: committed returns, CAPM
+    coefficients and alpha live in column `owner._col_of[symbol]`.
+    """
+    def __init__(self, symbol, owner):
         self.symbol      = symbol
-        self.df          = pd.DataFrame({'log_return': log_returns})
-        self.mean        = self.df['log_return'].mean() if not self.df.empty else 0.0
-
-        # intraperiod buffers (store *log-prices*)
-        self.price_buf   = []
-        self.time_buf    = []
-
-        # CAPM regression coefficients
-        self.intercept   = 0.0
-        self.beta        = 0.0
-
-        # one-month (≈21 trading days) cumulative log-return
-        # Will be refreshed every day by _refresh_one_month()
-        self.one_month   = 0.0
-
-        # custom alpha signal
-        self.alpha       = 0.0
+        self._owner      = owner
+
+    @property
+    def returns(self) -> np.ndarray:
+        """Committed log-returns, oldest first, one row per `owner._row_date` (view; NaN where no data)."""
+        owner = self._owner
+        return owner._ret_matrix[:, owner._col_of[self.symbol]]
+
+    @property
+    def intercept(self) -> float:
+        """CAPM intercept (daily)."""
+        owner = self._owner
+        return float(owner._intercept[owner._col_of[self.symbol]])
+
+    @property
+    def beta(self) -> float:
+        """CAPM beta against the market factor."""
+        owner = self._owner
+        return float(owner._beta[owner._col_of[self.symbol]])
+
+    @property
+    def alpha(self) -> float:
+        """Custom alpha signal of the last rebalance."""
+        owner = self._owner
+        return float(owner._alpha[owner._col_of[self.symbol]])
 
 # ======================  MAIN ALGORITHM  =============================
 class MeanVarianceWithDynamicUniverse(QCAlgorithm):
@@ -91,13 +194,47 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
         self.min_market_cap     = 2_000_000_000 # in $ (for universe selection)
         self.min_total_trade_qty= 5             # ← skip an entire rebalance if we’d move < N shares in total
         self.use_beta_shrink    = False # True  # ← turn ON/OFF "Blume adjustment"
+        self.use_cov_shrink     = True          # ← Ledoit-Wolf shrink of Σ toward constant correlation
+        self.use_slsqp          = False         # ← True: SLSQP max-Sharpe instead of closed-form min-variance
 
         # --- internal state ------------------------------------------
         self.symbol_data: dict[Symbol, SymbolData] = {}
-        self.entry_prices: dict[Symbol, float]     = {}
         self.days_since_rebalance                  = 0
         self.next_universe_refresh                 = self.Time
 
+        # --- SoA returns store (T × N): one column per symbol, newest day last ---
+        # every row is one trading day for every column; _row_date holds its
+        # date (NaT until the calendar is seeded from the first History call)
+        self._ret_matrix: np.ndarray               = np.full((self.num_history_days, 0), np.nan)
+        self._row_date: np.ndarray                 = np.full(self.num_history_days, np.datetime64('NaT'), dtype='datetime64[D]')
+        self._col_of: dict[Symbol, int]            = {}
+        self._sym_of_col: list                     = []    # column → Symbol (None when free)
+        self._free_cols: list[int]                 = []
+        # SPY's column and every other mapped column, rebuilt on universe change
+        self._spy_col: int                         = -1
+        self._non_spy_cols: np.ndarray             = np.zeros(0, dtype=np.intp)
+        # intraperiod log-prices; rows [0, _buf_pos) hold one bar each, shared by
+        # every column (all symbols see the same slice times) and dated in
+        # _buf_date. Row 0 carries the last bar of the previous period so the
+        # return into the first bar is kept; then the rebalance_period + 1 bars
+        # up to and including the roll day
+        buf_rows                                   = self.rebalance_period + 2
+        self._buf_mat: np.ndarray                  = np.full((buf_rows, 0), np.nan)
+        self._buf_date: np.ndarray                 = np.full(buf_rows, np.datetime64('NaT'), dtype='datetime64[D]')
+        self._buf_pos: int                         = 0
+        # one-month (≈21 trading days) cumulative log-return per column,
+        # refreshed by _refresh_one_month()
+        self._one_month: np.ndarray                = np.zeros(0)
+        # CAPM coefficients per column (from _run_regression) and the
+        # custom alpha signal, refreshed on rebalance day
+        self._intercept: np.ndarray                = np.zeros(0)
+        self._beta: np.ndarray                     = np.zeros(0)
+        self._alpha: np.ndarray                    = np.zeros(0)
+        # stop-loss state per column: entry price, held flag, scratch for today's closes
+        self._entry_px: np.ndarray                 = np.zeros(0)
+        self._invested: np.ndarray                 = np.zeros(0, dtype=bool)
+        self._closes: np.ndarray                   = np.zeros(0)
+
         # --- benchmark / market factor --------------------------------
         self.spy = self.AddEquity("NVDA", Resolution.Daily).Symbol
         self.SetBenchmark("NVDA")
@@ -130,9 +267,10 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
         for sec in changes.RemovedSecurities:
             sym = sec.Symbol
             self.symbol_data.pop(sym, None)
-            self.entry_prices.pop(sym, None)
+            self._release_col(sym)
             if self.Portfolio[sym].Invested:
                 self.Liquidate(sym)
+        self._index_cols()
 
         # ---- add new symbols ----------------------------------------
         added_syms = [sec.Symbol for sec in changes.AddedSecurities]
@@ -143,13 +281,39 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
         if history.empty:
             return
 
+        # log-closes by day (rows) and symbol (columns); today's bar is left
+        # for _update_buffers
+        close = history['close'].unstack(level=0).astype(float)
+        close = close[close.index < self.Time]
+        if close.empty:
+            return
+        close.index = pd.DatetimeIndex(close.index).normalize()
+        log_px = np.log(close)
+        self._seed_calendar(log_px.index.values.astype('datetime64[D]'))
+
+        rows     = ~np.isnat(self._row_date)
+        row_days = pd.DatetimeIndex(self._row_date[rows])
+        pos      = self._buf_pos
+        buf_days = pd.DatetimeIndex(self._buf_date[:pos])
         for sym in added_syms:
-            if sym not in history.index.levels[0]:
+            if sym not in log_px.columns:
                 continue
-            hist  = history.loc[sym]
-            log_p = np.log(hist['close'].astype(float))
-            log_r = log_p.diff().dropna()
-            self.symbol_data[sym] = SymbolData(sym, log_r)
+            log_p = log_px[sym].dropna()
+
+            self.symbol_data[sym] = SymbolData(sym, self)
+            col = self._col_of.get(sym)
+            if col is None:
+                col = self._alloc_col(sym)
+            self._intercept[col] = self._beta[col] = 0.0
+            # place History on the dates of the existing rows (last price at or
+            # before each date, as _update_buffers carries it), so every row is
+            # the same trading day for every column
+            self._ret_matrix[:, col]    = np.nan
+            self._ret_matrix[rows, col] = log_p.reindex(row_days, method='ffill').diff().values
+            self._buf_mat[:, col]       = np.nan
+            self._buf_mat[:pos, col]    = log_p.reindex(buf_days, method='ffill').values
+
+        self._index_cols()
 
         # refresh regression coefficients once we have SPY data
         if self.spy in self.symbol_data:
@@ -160,69 +324,62 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
     def _run_regression(self):
         """
         Vectorised CAPM β/α update.
-        • Align every symbol on SPY's calendar
+        • Align every symbol on SPY's calendar (rows of the SoA matrix)
         • Fill missing returns with 0
-        • Compute betas & intercepts in a single matrix pass
+        • Compute betas & intercepts in one fused pass per column (_capm_kernel)
         """
-        spy     = self.spy
-        spy_ret = self.symbol_data[spy].df['log_return']
-
-        # ---- 1) build aligned returns matrix (T × N) -------------------
-        ret_df = pd.concat(
-            {sym: sd.df['log_return'] for sym, sd in self.symbol_data.items()},
-            axis=1
-        ).reindex(spy_ret.index).fillna(0)      # (T × N) DataFrame
-
-        # ---- 2) prepare matrices --------------------------------------
-        x = ret_df[spy].values                  # SPY vector shape (T,)
-        y_mat = ret_df.drop(columns=spy).values # all stocks shape (T, M)
-        denom = np.dot(x, x)                    # scalar  Σ x²
+        if self._spy_col < 0:
+            return                              # SPY not mapped (yet / any more)
+
+        # ---- 1) SPY's calendar: rows of the SoA matrix where it has a return
+        x_all = self._ret_matrix[:, self._spy_col]
+        x     = x_all[~np.isnan(x_all)]         # SPY vector shape (T,)
+        denom = x @ x                           # scalar  Σ x²
         if denom == 0:
             return                              # safety guard
 
-        # ---- 3) vectorised β and α ------------------------------------
-        # OLS betas
-        beta_ols    = (x @ y_mat) / denom       # shape (M,)
-        # ---- 4) Optional Blume shrink toward 1.0 (to catch booms of new stuff like AI in 2022)
+        # ---- 2) Optional Blume shrink toward 1.0 (to catch booms of new stuff like AI in 2022)
         if getattr(self, "use_beta_shrink", False):
             w           = 0.6
             target_beta = 1.0
-            betas = w * target_beta + (1 - w) * beta_ols
         else:
-            betas = beta_ols
-
-        # --- 5) Intercepts
-        mean_x      = x.mean()
-        means_y     = y_mat.mean(axis=0)              # shape (M,)
-        intercepts  = means_y - betas * mean_x        # α₀ for each stock
-
-        # --- 6) write back to SymbolData ------------------------------
-        for sym, beta, alpha0 in zip(ret_df.drop(columns=spy).columns, betas, intercepts):
-            data = self.symbol_data[sym]
-            # optional: keep minimum length check (30 obs) for robustness
-            if len(data.df) < BETA_REG_WINDOW: # fewer than N daily returns
-                continue # leave existing beta / intercept unchanged
-            data.beta      = beta
-            data.intercept = alpha0
-    
+            w           = 0.0
+            target_beta = 0.0
+
+        # ---- 3) fused β / α₀ per column, written straight into the SoA arrays;
+        # columns with fewer than BETA_REG_WINDOW returns keep their values
+        _capm_kernel(self._ret_matrix, x_all, self._non_spy_cols,
+                     denom, x.mean(), x.size, w, target_beta, BETA_REG_WINDOW,
+                     self._beta, self._intercept)
+
     # -----------------------------------------------------------------
     #  MAIN DAILY LOOP
     # -----------------------------------------------------------------
     def OnData(self, slice: Slice):
 
         # ---------- 0) stop-loss enforcement -------------------------
-        for sym, entry_px in list(self.entry_prices.items()):
-            if slice.ContainsKey(sym) and slice[sym] and self.Portfolio[sym].Invested:
-                if float(slice[sym].Close) < entry_px * (1 - self.stop_loss_pct):
+        held = np.flatnonzero(self._invested)
+        if held.size:
+            closes       = self._closes
+            closes[held] = np.nan                  # no bar today → never triggers
+            for col in held:
+                sym = self._sym_of_col[col]
+                if slice.ContainsKey(sym) and slice[sym]:
+                    closes[col] = float(slice[sym].Close)
+            hit = held[closes[held] < self._entry_px[held] * (1 - self.stop_loss_pct)]
+            for col in hit:
+                sym = self._sym_of_col[col]
+                if self.Portfolio[sym].Invested:
                     self.Liquidate(sym)
-                    self.entry_prices.pop(sym, None)
+                    self._invested[col] = False
 
         # need SPY data for alpha calculation
         if not (slice.ContainsKey(self.spy) and slice[self.spy]):
             return
 
         # ---------- 1) rebalance day --------------------------------
-        if self.days_since_rebalance == 0 and len(self.symbol_data) >= self.min_positions:
+        if (self.days_since_rebalance == 0 and len(self.symbol_data) >= self.min_positions
+                and self._spy_col >= 0):
             # (a) buffer today’s close
             self._update_buffers(slice)
 
@@ -230,52 +387,55 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
             self._refresh_one_month()
 
             # ----- compute alpha signal (β-adjusted) -----------------
-            spy_data = self.symbol_data[self.spy]
-            for sym, data in self.symbol_data.items():
-                if sym == self.spy:
-                    continue
-                data.alpha = (data.one_month
-                            - self.rebalance_period * data.intercept
-                            - data.beta * spy_data.one_month)
+            alpha    = self._alpha
+            alpha[:] = (self._one_month
+                        - self.rebalance_period * self._intercept
+                        - self._beta * self._one_month[self._spy_col])
+            candidates = self._non_spy_cols
 
             # ----- pick top-N names ---------------------------------
-            candidates = [s for s in self.symbol_data if s != self.spy]
-            ranked     = sorted(candidates,
-                                key=lambda s: self.symbol_data[s].alpha,
-                                reverse=True)
-
             # old selecttion of at least 35 stocks (no matter what)
             # selected   = ranked[:self.min_positions]
 
             # --- HYBRID SELECTION LOGIC - only those with positive alpha are used ---
             # First, find all stocks with a positive alpha signal.
-            positive_alpha_candidates = [s for s in ranked if self.symbol_data[s].alpha > 0]
-
-            # If there are enough "good" signals, stick to the minimum of 35.
-            if len(positive_alpha_candidates) >= self.min_positions:
-                # Select the top 35 from the positive alpha list.
-                selected = positive_alpha_candidates[:self.min_positions]
-            else:
-                # Otherwise, if the market is weak and there aren't 35 "good" signals,
-                # select only the candidates that have a positive alpha.
-                selected = positive_alpha_candidates
+            top = candidates[alpha[candidates] > 0]
+
+            # If there are enough "good" signals, stick to the minimum of 35:
+            # partial-select the best 35 in O(N), then sort only those.
+            # Otherwise, if the market is weak and there aren't 35 "good" signals,
+            # select only the candidates that have a positive alpha.
+            if top.size > self.min_positions:
+                top = top[np.argpartition(-alpha[top], self.min_positions - 1)[:self.min_positions]]
+            top      = top[np.argsort(-alpha[top], kind="stable")]
+            selected = [self._sym_of_col[col] for col in top]
             
 
-            # ---------- assemble returns matrix ----------------------
-            ret_df = pd.concat({s: self.symbol_data[s].df['log_return']
-                                for s in selected}, axis=1).dropna()
+            # ---------- slice returns matrix -------------------------
+            if len(selected) < self.min_positions:
+                self.days_since_rebalance += 1
+                return
+
+            cols = np.fromiter((self._col_of[s] for s in selected),
+                               dtype=np.intp, count=len(selected))
+            # rows are trading days (_row_date), so keeping the dated rows where
+            # every selected name has a return is the date-joined dropna
+            sub  = self._ret_matrix[:, cols]
+            sub  = sub[~np.isnat(self._row_date) & ~np.isnan(sub).any(axis=1)]
 
-            if ret_df.empty or ret_df.shape[1] < self.min_positions:
+            if sub.shape[0] < 2:
                 self.days_since_rebalance += 1
                 return
 
-            means = ret_df.mean().values               # µ vector
-            cov   = ret_df.cov().values                # Σ matrix
+            means = sub.mean(axis=0)                   # µ vector
+            cov   = (_shrink_cov_constant_corr(sub)    # Σ matrix
+                     if self.use_cov_shrink else np.cov(sub, rowvar=False))
 
             # ---------- optimise weights -----------------------------
             opt     = Optimizer(selected, means, cov,
                                 long_only=True,
-                                max_weight=self.max_weight)
+                                max_weight=self.max_weight,
+                                use_slsqp=self.use_slsqp)
             weights = np.array(opt.optimize())
 
             # post-process weights
@@ -312,7 +472,9 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
             # ---------- execute trades ------------------------------
             for sym, w, _ in trades:
                 self.SetHoldings(sym, w)
-                self.entry_prices[sym] = float(self.Securities[sym].Price)
+                col = self._col_of[sym]
+                self._entry_px[col] = float(self.Securities[sym].Price)
+                self._invested[col] = True
 
             # *now* advance the clock for the rebalance window
             self.days_since_rebalance += 1
@@ -326,35 +488,107 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
 
         # ---------- 3) end-of-period maintenance -------------------
         if self.days_since_rebalance == self.rebalance_period:
+            self._update_buffers(slice)    # today's return belongs to this period
             self._roll_history()           # commit buffered data
             self._run_regression()         # refresh β / α
             self.Liquidate()               # clear residual positions
-            self.entry_prices.clear()
+            self._invested[:] = False
             self.days_since_rebalance = 0
 
 
     # ------------ UTILITIES -----------------------------------------
     def _update_buffers(self, slice: Slice):
-        """Append today’s log-price to each SymbolData buffer."""
-        for sym, data in self.symbol_data.items():
+        """Write today’s log-prices into the next buffer row."""
+        row = self._buf_pos
+        if row == self._buf_mat.shape[0]:
+            return                         # period already full
+        buf = self._buf_mat
+        # a symbol without a bar today carries its last price forward, so the
+        # move lands on its next bar (as the old date-aligned diff did)
+        buf[row] = buf[row - 1] if row else np.nan
+        for sym, col in self._col_of.items():
             if slice.ContainsKey(sym) and slice[sym]:
-                data.price_buf.append(np.log(float(slice[sym].Close)))
-                data.time_buf.append(slice[sym].EndTime)
+                buf[row, col] = math.log(float(slice[sym].Close))
+        self._buf_date[row] = np.datetime64(self.Time.date(), 'D')
+        self._buf_pos       = row + 1
 
     def _roll_history(self):
         """Commit buffered data and keep last N days."""
-        for data in self.symbol_data.values():
-            if not data.price_buf:
-                continue
-            buf_df = pd.DataFrame({'log_price': data.price_buf},
-                                  index=data.time_buf)
-            ret    = buf_df['log_price'].diff().dropna()
-            data.df = (pd.concat([data.df['log_return'], ret])
-                       .iloc[-self.num_history_days:]
-                       .to_frame('log_return'))
-            data.mean      = data.df['log_return'].mean()
-            data.price_buf = []
-            data.time_buf  = []
+        # n buffered rows give n-1 returns per column, dated by the later bar;
+        # the whole matrix shifts up by that many rows (rebalance_period < num_history_days)
+        pos = self._buf_pos
+        k   = pos - 1
+        if k > 0:
+            self._ret_matrix[:-k] = self._ret_matrix[k:]
+            self._row_date[:-k]   = self._row_date[k:]
+            self._ret_matrix[-k:] = np.diff(self._buf_mat[:pos], axis=0)
+            self._row_date[-k:]   = self._buf_date[1:pos]
+        # the last bar becomes the carry row of the next period
+        if pos:
+            self._buf_mat[0]  = self._buf_mat[k]
+            self._buf_date[0] = self._buf_date[k]
+        self._buf_mat[1:]  = np.nan
+        self._buf_date[1:] = np.datetime64('NaT')
+        self._buf_pos      = min(pos, 1)
+
+    def _seed_calendar(self, days):
+        """
+        Date the rows from the first History call: the carry row takes the
+        last day before today (if nothing is buffered yet) and the returns
+        matrix the days up to it, newest last.
+        """
+        if self._buf_pos == 0:
+            self._buf_date[0] = days[-1]
+            self._buf_pos     = 1
+        if not np.isnat(self._row_date).all():
+            return
+        days = days[days <= self._buf_date[0]][-self.num_history_days:]
+        self._row_date[:] = np.datetime64('NaT')
+        if days.size:
+            self._row_date[-days.size:] = days
+
+    # ------------ SoA column bookkeeping ------------------------------
+    def _alloc_col(self, sym) -> int:
+        """Hand out a free column of the returns matrix to `sym`."""
+        if not self._free_cols:
+            self._grow_cols()
+        col = self._free_cols.pop()
+        self._col_of[sym]     = col
+        self._sym_of_col[col] = sym
+        return col
+
+    def _index_cols(self):
+        """Cache SPY's column and the other mapped columns after a universe change."""
+        self._spy_col      = self._col_of.get(self.spy, -1)
+        self._non_spy_cols = np.fromiter((col for sym, col in self._col_of.items() if sym != self.spy),
+                                         dtype=np.intp)
+
+    def _release_col(self, sym):
+        """Blank a dropped symbol's column and return it to the free list."""
+        col = self._col_of.pop(sym, None)
+        if col is None:
+            return
+        self._ret_matrix[:, col] = np.nan
+        self._buf_mat[:, col]    = np.nan
+        self._invested[col]      = False
+        self._sym_of_col[col]    = None
+        self._free_cols.append(col)
+
+    def _grow_cols(self):
+        """Double the column capacity (universe changes are rare, so growth is too)."""
+        old = self._ret_matrix.shape[1]
+        new = max(2 * old, 64)
+        self._ret_matrix = _widen(self._ret_matrix, new, np.nan)
+        self._buf_mat    = _widen(self._buf_mat, new, np.nan)
+        self._one_month  = _widen(self._one_month, new, 0.0)
+        self._intercept  = _widen(self._intercept, new, 0.0)
+        self._beta       = _widen(self._beta, new, 0.0)
+        self._alpha      = _widen(self._alpha, new, 0.0)
+        self._entry_px   = _widen(self._entry_px, new, 0.0)
+        self._invested   = _widen(self._invested, new, False)
+        self._closes     = _widen(self._closes, new, np.nan)
+        self._sym_of_col.extend([None] * (new - old))
+        self._free_cols.extend(range(new - 1, old - 1, -1))   # lowest column is popped first
 
     # ------------ one-month refresh --------------------
     def _refresh_one_month(self):
@@ -364,30 +598,26 @@ class MeanVarianceWithDynamicUniverse(QCAlgorithm):
         buffers. Ensures the alpha signal includes today's return and
         removes the 1-day lag.
         """
-        for data in self.symbol_data.values():
-
-            # committed history
-            hist_returns = data.df['log_return'].values
-
-            # convert buffered log-prices to intraday returns
-            if len(data.price_buf) >= 2:
-                buf_returns = np.diff(data.price_buf)
-                returns = np.concatenate([hist_returns, buf_returns])
-            else:
-                returns = hist_returns
-
-            # 21-day rolling sum (shorter if insufficient history)
-            data.one_month = returns[-TRADING_DAYS_PER_MONTH:].sum() if returns.size else 0.0
+        _one_month_kernel(self._ret_matrix, self._buf_mat, self._buf_pos,
+                          self._one_month, TRADING_DAYS_PER_MONTH)
 
 class Optimizer:
-    """Mean-variance optimiser with optional long-only cap."""
+    """
+    Mean-variance optimiser with optional long-only cap.
+    With µ ≈ 0 (see header) max-Sharpe collapses to min-variance, which the
+    long-only path solves exactly by an active set over Cholesky solves;
+    `use_slsqp` keeps the original SLSQP max-Sharpe search for comparison.
+    """
+    RIDGE = 1e-8    # diagonal jitter so the Cholesky never fails on a singular Σ
+
     def __init__(self, symbols, means, cov,
-                 long_only=True, max_weight=1.0):
+                 long_only=True, max_weight=1.0, use_slsqp=False):
         self.symbols    = symbols
         self.means      = means
         self.cov        = cov
         self.long_only  = long_only
         self.max_weight = max_weight
+        self.use_slsqp  = use_slsqp
 
     # We minimizing the inverse Sharpe (annualised) (equivalent to maximising the annualised Sharpe ratio)
     def _objective(self, w):
@@ -398,6 +628,72 @@ class Optimizer:
         return np.sqrt(var) / ret if ret != 0 else 1e6
 
     def optimize(self):
+        if self.use_slsqp or not self.long_only:
+            return self._optimize_slsqp()
+        return self._optimize_min_variance()
+
+    def _optimize_min_variance(self):
+        """
+        min wᵀΣw  s.t.  Σw = 1, 0 ≤ w ≤ max_weight, by a primal active set:
+        from the feasible 1/n start, step toward the equality-constrained
+        optimum of the free names, stop at the first bound hit and pin only
+        that name; at a stationary point release the pinned name whose KKT
+        multiplier has the wrong sign, or return once none has. Falls back
+        to SLSQP if the caps are infeasible or the loop does not settle.
+        """
+        n   = len(self.symbols)
+        cap = self.max_weight
+        if n * cap < 1.0:
+            return self._optimize_slsqp()   # no feasible start (and no solution)
+
+        cov  = self.cov + self.RIDGE * np.eye(n)
+        w    = np.full(n, 1.0 / n)
+        free = np.ones(n, dtype=bool)       # complement = working set (pinned at 0 or cap)
+
+        for _ in range(10 * n):
+            pinned = ~free
+            step   = np.zeros(n)
+            lam    = None
+            if free.any():
+                # KKT on the free block: w_F = λ·Σ_FF⁻¹1 − Σ_FF⁻¹Σ_FP·w_P
+                budget     = 1.0 - w[pinned].sum()
+                factor     = cho_factor(cov[np.ix_(free, free)])
+                u          = cho_solve(factor, np.ones(free.sum()))
+                v          = cho_solve(factor, cov[np.ix_(free, pinned)] @ w[pinned])
+                lam        = (budget + v.sum()) / u.sum()
+                step[free] = lam * u - v - w[free]
+
+            if np.abs(step).max() > 1e-12:
+                # ratio test: go as far toward the optimum as the bounds allow
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    room = np.where(step < 0, -w / step, (cap - w) / step)
+                room[~free | (np.abs(step) <= 1e-15)] = np.inf
+                block = int(np.argmin(room))
+                alpha = min(1.0, room[block])
+                w    += alpha * step
+                if alpha < 1.0:
+                    w[block]    = 0.0 if step[block] < 0 else cap
+                    free[block] = False
+                continue
+
+            # stationary on the working set: check the pinned names' multipliers
+            grad  = cov @ w
+            lower = pinned & (w <= 0.0)
+            upper = pinned & ~lower
+            if lam is None:                 # every name pinned: λ is any value in between
+                lo  = grad[upper].max() if upper.any() else grad[lower].min()
+                hi  = grad[lower].min() if lower.any() else grad[upper].max()
+                lam = 0.5 * (lo + hi)
+            mult         = np.where(lower, grad - lam, lam - grad)
+            mult[free]   = np.inf
+            worst        = int(np.argmin(mult))
+            if mult[worst] >= -1e-12 * np.abs(grad).max():
+                return w
+            free[worst] = True
+
+        return self._optimize_slsqp()
+
+    def _optimize_slsqp(self):
         n        = len(self.symbols)
         x0       = np.ones(n) / n
         cons     = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1}]
@@ -0,0 +1,24 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+
+# ---------------------------
+# Numba JIT with graceful fallback
+# ---------------------------
+# Per-symbol kernels are decorated with `njit` and loop over `prange` from
+# here. If numba is not available in the running environment the decorator
+# is a no-op, `prange` is plain `range`, and the kernels run as ordinary
+# Python with identical results.
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and parametrized use)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -26,6 +26,11 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
 
         self.sector_stocks_map = SECTOR_STOCKS_MAP
 
+        # Sector ETFs that also have a stock list, and the inverse ETF symbol -> sector lookup
+        available_sectors = set(self.sector_etf_map.keys()) & set(self.sector_stocks_map.keys())
+        self._sector_etf_symbols = [self.sector_etf_map[sector] for sector in available_sectors]
+        self._symbol_to_sector = {v: k for k, v in self.sector_etf_map.items()}
+
         self.sector_filters = {}
         self.last_filter_update = datetime.min
         self.filter_update_frequency = StrategyConfig.FILTER_UPDATE_FREQUENCY
@@ -40,6 +45,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
         
         self.universe_symbols = []
         self.selected_sectors = []
+        self._selected_sector_stocks = frozenset()  # tickers of the selected sectors, for O(1) coarse membership
         
         self.add_universe(self.coarse_selection_function, self.fine_selection_function)
         
@@ -108,29 +114,13 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
 
     def warm_up_historical_data(self):
         try:
-            # etf_symbols = list(self.sector_etf_map.values())
-            available_sectors = set(self.sector_etf_map.keys()) & set(self.sector_stocks_map.keys())
-            etf_symbols = [self.sector_etf_map[sector] for sector in available_sectors]
-            
-            history = self.history(etf_symbols, self.warmup_period, Resolution.DAILY)
+            history = self.history(self._sector_etf_symbols, self.warmup_period, Resolution.DAILY)
             
             if history is not None and not history.empty:
                 self.log(f"Warmed up with {len(history)} points")
                 
                 # Calculate initial sector returns
-                temp_sector_returns = {}
-                for symbol, df in history.groupby(level=0):
-                    if len(df) >= 2:
-                        start_price = df.iloc[0]['close']
-                        end_price = df.iloc[-1]['close']
-                        
-                        if start_price > 0:
-                            ret = (end_price / start_price) - 1
-                            sector_code = next((k for k, v in self.sector_etf_map.items() if v == symbol), None)
-                            if sector_code:
-                                temp_sector_returns[sector_code] = ret
-                
-                self.sector_returns = temp_sector_returns
+                self.sector_returns = self.calculate_sector_returns(history)
                 formatted = {k: f"{v:.2f}" for k, v in self.sector_returns.items()}
                 self.log(f"Initial sector returns calculated: {formatted}")
             else:
@@ -463,12 +453,26 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
         if stop_loss_executed:
             self.trigger_rebalance("Scheduled stop loss executed")
 
+    def calculate_sector_returns(self, history):
+        """Return over the history window for every sector ETF, keyed by sector name."""
+        # one column of closes per ETF; first/last valid close per column
+        closes = history['close'].unstack(level=0)
+        first = closes.bfill().iloc[0]
+        last = closes.ffill().iloc[-1]
+        valid = (closes.count() >= 2) & (first > 0)
+        returns = (last[valid] / first[valid]) - 1
+
+        sector_returns = {}
+        for symbol, ret in returns.items():
+            sector_code = self._symbol_to_sector.get(symbol)
+            if sector_code: sector_returns[sector_code] = ret
+        return sector_returns
+
     def UpdateUniverse(self):
         if not self.is_warmed_up or self.emergency_liquidation:
             return
 
-        available_sectors = set(self.sector_etf_map.keys()) & set(self.sector_stocks_map.keys())
-        etf_symbols = [self.sector_etf_map[sector] for sector in available_sectors]
+        etf_symbols = self._sector_etf_symbols
         
         if not etf_symbols:
             self.log("No sector ETFs defined. Cannot update sector returns.")
@@ -480,20 +484,10 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
             self.sector_returns = {}
             return
 
-        temp_sector_returns = {}
-        for symbol, df in history.groupby(level=0):
-            if len(df) < 2: continue
-            
-            start_price = df.iloc[0]['close']
-            end_price = df.iloc[-1]['close']
-            
-            if start_price > 0:
-                ret = (end_price / start_price) - 1
-                sector_code = next((k for k, v in self.sector_etf_map.items() if v == symbol), None)
-                if sector_code: temp_sector_returns[sector_code] = ret
-        
-        self.sector_returns = temp_sector_returns
+        self.sector_returns = self.calculate_sector_returns(history)
         self.selected_sectors = log_sector_performance(self, self.sector_returns, self.num_sectors)
+        self._selected_sector_stocks = frozenset().union(
+            *(self.sector_stocks_map[sector] for sector in self.selected_sectors if sector in self.sector_stocks_map))
         
         # Universe update completed
 
@@ -506,17 +500,8 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
             self.log("No sectors selected yet, returning empty coarse selection")
             return []
 
-        symbol_names = [s.value for s in self.universe_symbols]
-        # Previous universe
-        filtered = [x for x in coarse if x.has_fundamental_data and x.market_cap > StrategyConfig.MIN_MARKET_CAP and x.dollar_volume > StrategyConfig.MIN_DOLLAR_VOLUME and x.price > StrategyConfig.MIN_PRICE]
-        # sorted_by_volume = sorted(filtered, key=lambda x: x.dollar_volume, reverse=True)
-
-                
-        # Get all stocks from selected sectors
-        sector_stocks = set()
-        for sector in self.selected_sectors:
-            if sector in self.sector_stocks_map:
-                sector_stocks.update(self.sector_stocks_map[sector])
+        # Stocks from selected sectors (rebuilt only when the sectors change)
+        sector_stocks = self._selected_sector_stocks
         
         # Sector filtering
         
@@ -219,21 +219,28 @@ SECTOR_STOCKS_MAP = {
 # UTILITY FUNCTIONS
 # =============================================================================
 
+# Field names the debt-to-equity ratio may be exposed under, in lookup order
+DEBT_TO_EQUITY_FIELDS = ('debt_to_equity', 'total_debt_to_equity', 'debt_to_equity_ratio')
+
 def passes_fundamental_filters(stock_fine_data, sector_filter, stock_ticker=None, algorithm=None):
     """Check if stock passes fundamental filters"""
     try:
+        # Each ratio group is fetched from the .NET object once
+        valuation_ratios = stock_fine_data.valuation_ratios
+        operation_ratios = stock_fine_data.operation_ratios
+        
         # PE Ratio check
-        pe_ratio = stock_fine_data.valuation_ratios.pe_ratio
+        pe_ratio = valuation_ratios.pe_ratio
         if pe_ratio <= 0 or pe_ratio < sector_filter['pe_ratio_min'] or pe_ratio > sector_filter['pe_ratio_max']:
             return False
         
         # PB Ratio check
-        pb_ratio = stock_fine_data.valuation_ratios.pb_ratio
+        pb_ratio = valuation_ratios.pb_ratio
         if pb_ratio <= 0 or pb_ratio > sector_filter['pb_ratio_max']:
             return False
         
         # ROE check
-        roe = stock_fine_data.operation_ratios.roe.one_year
+        roe = operation_ratios.roe.one_year
         if roe <= 0 or roe < sector_filter['roe_min']:
             return False
         
@@ -245,13 +252,13 @@ def passes_fundamental_filters(stock_fine_data, sector_filter, stock_ticker=None
         
         # Debt to Equity check (optional - only if data is available)
         try:
+            # one getattr per candidate name instead of hasattr + a second lookup
             debt_to_equity = None
-            if hasattr(stock_fine_data.operation_ratios, 'debt_to_equity'):
-                debt_to_equity = stock_fine_data.operation_ratios.debt_to_equity.one_year
-            elif hasattr(stock_fine_data.operation_ratios, 'total_debt_to_equity'):
-                debt_to_equity = stock_fine_data.operation_ratios.total_debt_to_equity.one_year
-            elif hasattr(stock_fine_data.operation_ratios, 'debt_to_equity_ratio'):
-                debt_to_equity = stock_fine_data.operation_ratios.debt_to_equity_ratio.one_year
+            for field in DEBT_TO_EQUITY_FIELDS:
+                ratio = getattr(operation_ratios, field, None)
+                if ratio is not None:
+                    debt_to_equity = ratio.one_year
+                    break
             
             if debt_to_equity is not None and debt_to_equity > sector_filter['debt_to_equity_max']:
                 return False
@@ -4,6 +4,7 @@ Handles coarse and fine selection, sector analysis, and stock filtering
 """
 
 from AlgorithmImports import *
+import heapq
 from utils import (
     StrategyConfig, SECTOR_ETF_MAP, DEFAULT_SECTOR_FILTERS, SECTOR_STOCKS_MAP,
     passes_fundamental_filters, calculate_fundamental_score, build_final_universe,
@@ -12,6 +13,9 @@ from utils import (
 from momentum_utils import check_positive_momentum, log_momentum_summary
 from SNP_Influencers import IntegratedSP500Tracker
 
+# Reverse index ticker -> sector, so fine data is routed to its sector in one pass
+SYMBOL_TO_SECTOR = {ticker: sector for sector, stocks in SECTOR_STOCKS_MAP.items() for ticker in stocks}
+
 class UniverseSelector:
     """Handles universe selection logic"""
     
@@ -27,6 +31,9 @@ class UniverseSelector:
         self.last_filter_update = datetime.min
         self.filter_update_frequency = StrategyConfig.FILTER_UPDATE_FREQUENCY
         self.selected_sectors = []
+        # Informational selection logs (verbose_logs=1) are built only when enabled;
+        # errors are always logged
+        self.verbose = algorithm.live_mode or algorithm.get_parameter("verbose_logs", 0) == 1
         
         # Initialize S&P 500 tracker
         self.sp500_tracker = IntegratedSP500Tracker(algorithm)
@@ -63,9 +70,6 @@ class UniverseSelector:
                 except Exception as e:
                     self.algorithm.log(f"S&P 500 processing error: {str(e)}")
             
-            # Create lookup dictionary for fine data
-            fine_data_lookup = {data.symbol.value: data for data in fine_data_list}
-            
             # Get selected sectors
             self.selected_sectors = self.get_rising_sectors()
             
@@ -73,50 +77,61 @@ class UniverseSelector:
                 self.algorithm.log("No rising sectors found")
                 return Universe.UNCHANGED
             
+            # Route fine data of the selected sectors into per-sector buckets in one pass
+            sector_fine = {sector: [] for sector in self.selected_sectors if sector in self.sector_stocks_map}
+            for data in fine_data_list:
+                bucket = sector_fine.get(SYMBOL_TO_SECTOR.get(data.symbol.value))
+                if bucket is not None:
+                    bucket.append(data)
+            
             # Filter stocks by sector and fundamentals
             sector_filtered_stocks = {}
+            blacklisted_stocks = self.algorithm.risk_manager.blacklisted_stocks
             
-            for sector in self.selected_sectors:
-                if sector not in self.sector_stocks_map:
-                    continue
-                
-                sector_stocks = self.sector_stocks_map[sector]
+            for sector, sector_data in sector_fine.items():
                 sector_filter = self.sector_filters[sector]
-                filtered_stocks = []
-                momentum_results = []
+                # Min-heap of (score, -position, stock) holding the best 3 so far;
+                # -position makes earlier stocks win ties, like a stable sort
+                top_stocks = []
+                momentum_results = [] if self.verbose else None
                 
-                for stock_ticker in sector_stocks:
-                    if stock_ticker in self.algorithm.risk_manager.blacklisted_stocks:
-                        continue
-                    
-                    try:
-                        stock_fine_data = fine_data_lookup[stock_ticker]
-                    except:
-                        stock_fine_data = None
+                for position, stock_fine_data in enumerate(sector_data):
+                    stock_ticker = stock_fine_data.symbol.value
+                    if stock_ticker in blacklisted_stocks:
                         continue
 
                     if not passes_fundamental_filters(stock_fine_data, sector_filter, stock_ticker=stock_ticker, algorithm=self.algorithm):
                         continue
 
-                    # Check for positive momentum - only include stocks with upward momentum
-                    if not check_positive_momentum(self.algorithm, stock_ticker, stock_fine_data, momentum_results):
-                        continue
-
                     try:
                         pe_ratio = stock_fine_data.valuation_ratios.pe_ratio
                         roe = stock_fine_data.operation_ratios.roe.one_year
                         score = calculate_fundamental_score((stock_ticker, stock_fine_data, pe_ratio, roe), sector)
                         actual_ticker = stock_fine_data.symbol.Value  
-                        filtered_stocks.append((actual_ticker, stock_fine_data, score))
                     except Exception as e:
                         continue
 
+                    # A stock that cannot displace the weakest of a full top 3 is
+                    # dropped before its momentum history request
+                    if len(top_stocks) == 3 and (score, -position) <= top_stocks[0][:2]:
+                        continue
+
+                    # Check for positive momentum - only include stocks with upward momentum
+                    if not check_positive_momentum(self.algorithm, stock_ticker, stock_fine_data, momentum_results):
+                        continue
+
+                    entry = (score, -position, (actual_ticker, stock_fine_data, score))
+                    if len(top_stocks) < 3:
+                        heapq.heappush(top_stocks, entry)
+                    else:
+                        heapq.heappushpop(top_stocks, entry)
+
                 # Log momentum summary for this sector
-                log_momentum_summary(self.algorithm, momentum_results, sector)
+                if self.verbose:
+                    log_momentum_summary(self.algorithm, momentum_results, sector)
                 
-                # Sort by score and take top 3 stocks per sector
-                filtered_stocks.sort(key=lambda x: x[2], reverse=True)
-                sector_filtered_stocks[sector] = filtered_stocks[:3]
+                # Top 3 stocks per sector, best first
+                sector_filtered_stocks[sector] = [stock for _, _, stock in sorted(top_stocks, reverse=True)]
             
             # Build sector-based universe (12 stocks: 3 per sector)
             sector_universe = build_final_universe(self.algorithm, sector_filtered_stocks, 12)
@@ -131,11 +146,12 @@ class UniverseSelector:
             if hasattr(self, 'sp500_tracker') and self.sp500_tracker is not None:
                 try:
                     sp500_stocks = self.sp500_tracker.get_top_missing_sp500_stocks(sector_universe, top_n=8, algorithm=self.algorithm)
-                    if sp500_stocks:
-                        sp500_names = [s.value for s in sp500_stocks]
-                        self.algorithm.log(f"S&P 500 stocks ({len(sp500_stocks)} stocks): {sp500_names}")
-                    else:
-                        self.algorithm.log("No S&P 500 stocks available (all filtered out by momentum)")
+                    if self.verbose:
+                        if sp500_stocks:
+                            sp500_names = [s.value for s in sp500_stocks]
+                            self.algorithm.log(f"S&P 500 stocks ({len(sp500_stocks)} stocks): {sp500_names}")
+                        else:
+                            self.algorithm.log("No S&P 500 stocks available (all filtered out by momentum)")
                 except Exception as e:
                     self.algorithm.log(f"S&P 500 error: {str(e)}")
             
@@ -147,7 +163,8 @@ class UniverseSelector:
                 if sp500_symbol.value not in sector_symbols:
                     final_universe.append(sp500_symbol)
             
-            self.algorithm.log(f"Final universe: {len(final_universe)} stocks ({len(sector_universe)} sector + {len(final_universe) - len(sector_universe)} S&P 500)")
+            if self.verbose:
+                self.algorithm.log(f"Final universe: {len(final_universe)} stocks ({len(sector_universe)} sector + {len(final_universe) - len(sector_universe)} S&P 500)")
             
             return final_universe if final_universe else Universe.UNCHANGED
             
@@ -1,7 +1,6 @@
 # region imports
 from AlgorithmImports import *
 from datetime import timedelta
-from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 # endregion
 
@@ -16,12 +15,8 @@ def calculate_linear_weights(symbols):
     if n <= 1:
         return [1.0]
 
-    worst_weight = 2.0 / (3.0 * n)
-    best_weight = 2.0 * worst_weight
-    step = (best_weight - worst_weight) / (n - 1)
-    weights = [best_weight - i * step for i in range(n)]
-    total = sum(weights)
-    return [w / total for w in weights]
+    # Arithmetic sequence 2w .. w sums to 1.5 * n * w, so w = 1 / (1.5 * n)
+    return (np.linspace(2.0, 1.0, n) / (1.5 * n)).tolist()
 
 
 class UniverseSelectionAlgorithm(QCAlgorithm):
@@ -67,85 +62,90 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
         return [x.Symbol for x in sorted_by_volume[:500]]
 
     def FineSelectionFunction(self, fine):
-        filtered = []
+        fine = list(fine)
+        # Values read for the filters are reused for the features, so each
+        # fundamental is fetched from the bridge only once. Rows go straight
+        # into a preallocated feature matrix.
+        features = np.empty((len(fine), 7))
+        symbols = np.empty(len(fine), dtype=object)
+        n = 0
         for f in fine:
-            if f.MarketCap < self.min_market_cap:
+            market_cap = f.MarketCap
+            if market_cap < self.min_market_cap:
                 continue
 
+            # Cheapest rejections first; the balance sheet chain is walked last
             pe = f.ValuationRatios.PERatio
             if pe is None or pe <= self.pe_ratio_min:
                 continue
 
-            equity = f.FinancialStatements.BalanceSheet.TotalEquity.Value
-            debt = f.FinancialStatements.BalanceSheet.TotalDebt.Value
-            if equity <= 0:
-                continue
-            d2e = debt / equity
-            if d2e > self.debt_to_equity_max:
-                continue
-
-            roe = f.OperationRatios.ROE.OneYear
+            op = f.OperationRatios
+            roe = op.ROE.OneYear
             if roe is None or roe < self.roe_min:
                 continue
 
-            if f.OperationRatios.RevenueGrowth.OneYear < 0:
+            rev_growth = op.RevenueGrowth.OneYear
+            if rev_growth < 0:
                 continue
 
-            liabilities = f.FinancialStatements.BalanceSheet.CurrentLiabilities.Value
-            assets = f.FinancialStatements.BalanceSheet.CurrentAssets.Value
-            if liabilities <= 0 or (assets / liabilities) < 1.0:
+            bs = f.FinancialStatements.BalanceSheet
+            liabilities = bs.CurrentLiabilities.Value
+            if liabilities <= 0 or (bs.CurrentAssets.Value / liabilities) < 1.0:
                 continue
 
-            filtered.append(f)
-
-        # Build raw feature matrix
-        data = []
-        symbols = []
-        for f in filtered:
-            roe = f.OperationRatios.ROE.OneYear
-            pe = f.ValuationRatios.PERatio
-            rev_growth = f.OperationRatios.RevenueGrowth.OneYear
-            equity = f.FinancialStatements.BalanceSheet.TotalEquity.Value
-            debt = f.FinancialStatements.BalanceSheet.TotalDebt.Value
-            d2e = debt / equity if equity > 0 else 1
-
-            if None in [roe, pe, rev_growth] or pe <= 0:
+            equity = bs.TotalEquity.Value
+            if equity <= 0:
+                continue
+            d2e = bs.TotalDebt.Value / equity
+            if d2e > self.debt_to_equity_max:
                 continue
 
-            gross_margin = f.OperationRatios.GrossMargin.Value
-            rd_expense = f.FinancialStatements.IncomeStatement.ResearchAndDevelopment.Value
-            total_revenue = f.FinancialStatements.IncomeStatement.TotalRevenue.Value
+            # Raw feature row
+            gross_margin = op.GrossMargin.Value
+            income = f.FinancialStatements.IncomeStatement
+            rd_expense = income.ResearchAndDevelopment.Value
+            total_revenue = income.TotalRevenue.Value
             rd_to_revenue = rd_expense / total_revenue if total_revenue > 0 else 0
 
-            data.append([
+            features[n, :] = (
                 roe,
                 rev_growth,
                 1 / pe,
                 1 / (1 + d2e),
-                np.log(f.MarketCap + 1),
+                np.log(market_cap + 1),
                 gross_margin,
                 rd_to_revenue
-            ])
-
-            symbols.append(f.Symbol)
+            )
+            symbols[n] = f.Symbol
+            n += 1
 
-        if not data:
+        if n == 0:
             return []
 
-        # Normalize all features between 0 and 1
-        scaler = MinMaxScaler()
-        X_scaled = scaler.fit_transform(data)
+        features = features[:n]
+        symbols = symbols[:n]
+
+        # Min-max normalize in place (constant columns map to 0, as MinMaxScaler did)
+        mn = features.min(axis=0)
+        rng = features.max(axis=0) - mn
+        rng[rng == 0] = 1
+        np.subtract(features, mn, out=features)
+        np.divide(features, rng, out=features)
 
         # Apply weights to normalized features
-        weights = [0.30,   0.30  , 0.05, 0.10     , 0.15     , 0.05, 0.05]
-        #         [ROE ,   Growth, 1/PE, 1/(1+D/E), log(MCap), GM  , R&D]
+        weights = np.array([0.30,   0.30  , 0.05, 0.10     , 0.15     , 0.05, 0.05])
+        #                  [ROE ,   Growth, 1/PE, 1/(1+D/E), log(MCap), GM  , R&D]
 
 
-        scores = X_scaled.dot(weights)
+        scores = features @ weights  # single gemv, no list-to-array conversion
 
-        # Rank and select top 10
-        ranked = sorted(zip(symbols, scores), key=lambda x: x[1], reverse=True)
-        top = [x[0] for x in ranked[:10]]
+        # Partition out the top 10, then sort only those. Everything tied with the 10th score
+        # stays a candidate and the stable sort keeps ties in original order, as sorted() did.
+        k = min(10, n)
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        top_idx = np.flatnonzero(scores >= kth)
+        top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")][:k]
+        top = list(symbols[top_idx])
 
         if top:
             self.Debug(f"Selected {len(top)} stocks: {[s.Value for s in top]}")
@@ -162,12 +162,14 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
 
         # Get the latest slice (market data)
         slice = self.CurrentSlice
+        securities = self.Securities
 
-        # Filter for symbols that have up-to-date data
-        tradable_symbols = [
-            s for s in symbols
-            if self.Securities[s].HasData and s in slice and slice[s] is not None and slice[s].Price > 0
-        ]
+        # Filter for symbols that have up-to-date data (one slice lookup per symbol)
+        tradable_symbols = []
+        for s in symbols:
+            bar = slice.get(s)
+            if bar is not None and bar.Price > 0 and securities[s].HasData:
+                tradable_symbols.append(s)
 
         if not tradable_symbols:
             self.Debug("No tradable symbols with current price data.")
@@ -186,13 +188,18 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
 
         symbol = orderEvent.Symbol
 
-        if symbol in self.entryTickets and self.entryTickets[symbol].OrderId == orderEvent.OrderId:
-            stop_price = (1 - self.stop_loss) * self.entryTickets[symbol].AverageFillPrice
-            self.stopMarketTickets[symbol] = self.StopMarketOrder(symbol, -self.entryTickets[symbol].Quantity, stop_price)
-            self.highestPrices[symbol] = self.entryTickets[symbol].AverageFillPrice
+        # Fetch each ticket once; it is only removed when this fill is its order
+        ticket = self.entryTickets.get(symbol)
+        if ticket is not None and ticket.OrderId == orderEvent.OrderId:
+            fill_price = ticket.AverageFillPrice
+            stop_price = (1 - self.stop_loss) * fill_price
+            self.stopMarketTickets[symbol] = self.StopMarketOrder(symbol, -ticket.Quantity, stop_price)
+            self.highestPrices[symbol] = fill_price
             del self.entryTickets[symbol]
+            return
 
-        elif symbol in self.stopMarketTickets and self.stopMarketTickets[symbol].OrderId == orderEvent.OrderId:
+        ticket = self.stopMarketTickets.get(symbol)
+        if ticket is not None and ticket.OrderId == orderEvent.OrderId:
             self.stopMarketOrderFillTimes[symbol] = self.Time
             self.highestPrices[symbol] = 0
             del self.stopMarketTickets[symbol]
@@ -202,12 +209,15 @@ class UniverseSelectionAlgorithm(QCAlgorithm):
         if self.IsWarmingUp:
             return
 
-        symbols = list(self.ActiveSecurities.Keys)
+        symbols = tuple(self.ActiveSecurities.Keys)
         for symbol in symbols:
-            if symbol not in data or not data[symbol]:
+            if symbol not in data:
+                continue
+            bar = data[symbol]
+            if not bar:
                 continue
 
-            price = data[symbol].Price
+            price = bar.Price
 
             if symbol not in self.stopMarketOrderFillTimes:
                 self.stopMarketOrderFillTimes[symbol] = self.Time - timedelta(days=31)
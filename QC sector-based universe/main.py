@@ -28,21 +28,10 @@ def calculate_linear_weights(universe_symbols):
     # Sum of arithmetic sequence = n * (first + last) / 2 = n * (2w + w) / 2 = 1.5 * n * w
     # Since sum must equal 1: 1.5 * n * w = 1, so w = 2 / (3 * n)
     
-    worst_weight = 2.0 / (3.0 * n)
-    best_weight = 2.0 * worst_weight
+    # Linear weights from best (2w) to worst (w), already summing to 1
+    weights = np.linspace(2.0, 1.0, n) / (1.5 * n)
     
-    # Create linear weights from best to worst
-    weights = []
-    for i in range(n):
-        # Linear interpolation between best_weight and worst_weight
-        weight = best_weight - i * (best_weight - worst_weight) / (n - 1)
-        weights.append(weight)
-    
-    # Normalize to ensure sum equals 1 (handle floating point precision)
-    total_weight = sum(weights)
-    weights = [w / total_weight for w in weights]
-    
-    return weights
+    return weights.tolist()
 
 # QuantConnect Universe Selection Algorithm
 # This script demonstrates various stock selection criteria
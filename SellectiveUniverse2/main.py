@@ -1,5 +1,21 @@
 from AlgorithmImports import *
 
+# Sector -> constituent tickers (GICS sector names)
+SECTOR_STOCKS_MAP = {
+    "Information Technology": ["MSFT", "AAPL", "NVDA", "AVGO", "ORCL", "CRM", "ADBE", "CSCO", "AMD", "INTC"],
+    "Communication Services": ["GOOG", "GOOGL", "META", "NFLX", "DIS", "CMCSA", "VZ", "T", "TMUS", "CHTR"],
+    "Consumer Discretionary": ["AMZN", "TSLA", "HD", "MCD", "NKE", "SBUX", "LOW", "TJX", "BKNG", "CMG"],
+    "Financials": ["BRK.B", "JPM", "V", "MA", "BAC", "WFC", "GS", "MS", "BLK", "AXP"],
+    "Health Care": ["LLY", "UNH", "JNJ", "MRK", "ABBV", "PFE", "TMO", "ABT", "DHR", "BMY"],
+    "Industrials": ["CAT", "GE", "HON", "UPS", "FDX", "MMM", "RTX", "LMT", "DE", "BA"],
+    "Consumer Staples": ["WMT", "PG", "COST", "KO", "PEP", "CL", "KMB", "GIS", "K", "CPB"],
+    "Energy": ["XOM", "CVX", "COP", "EOG", "SLB", "PXD", "KMI", "WMB", "MPC", "VLO"],
+    "Materials": ["LIN", "APD", "SHW", "FCX", "NEM", "DOW", "DD", "PPG", "ECL", "IFF"],
+    "Real Estate": ["AMT", "PLD", "CCI", "EQIX", "PSA", "EXR", "AVB", "EQR", "MAA", "SPG"],
+    "Utilities": ["NEE", "DUK", "SO", "D", "AEP", "EXC", "XEL", "SRE", "PEG", "WEC"]
+}
+
+
 class RisingSectorFundamentalUniverse(QCAlgorithm):
 
     def initialize(self):
@@ -32,21 +48,11 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
             "Real Estate": self.add_equity("XLRE", Resolution.DAILY).Symbol,
             "Utilities": self.add_equity("XLU", Resolution.DAILY).Symbol
         }
+        # Inverse lookup (ETF symbol -> sector) for mapping returns back to sectors
+        self._symbol_to_sector = {v: k for k, v in self.sector_etf_map.items()}
 
         # RESTORED: Your original sector stocks dictionary with corrected GICS names
-        self.sector_stocks_map = {
-            "Information Technology": ["MSFT", "AAPL", "NVDA", "AVGO", "ORCL", "CRM", "ADBE", "CSCO", "AMD", "INTC"],
-            "Communication Services": ["GOOG", "GOOGL", "META", "NFLX", "DIS", "CMCSA", "VZ", "T", "TMUS", "CHTR"],
-            "Consumer Discretionary": ["AMZN", "TSLA", "HD", "MCD", "NKE", "SBUX", "LOW", "TJX", "BKNG", "CMG"],
-            "Financials": ["BRK.B", "JPM", "V", "MA", "BAC", "WFC", "GS", "MS", "BLK", "AXP"],
-            "Health Care": ["LLY", "UNH", "JNJ", "MRK", "ABBV", "PFE", "TMO", "ABT", "DHR", "BMY"],
-            "Industrials": ["CAT", "GE", "HON", "UPS", "FDX", "MMM", "RTX", "LMT", "DE", "BA"],
-            "Consumer Staples": ["WMT", "PG", "COST", "KO", "PEP", "CL", "KMB", "GIS", "K", "CPB"],
-            "Energy": ["XOM", "CVX", "COP", "EOG", "SLB", "PXD", "KMI", "WMB", "MPC", "VLO"],
-            "Materials": ["LIN", "APD", "SHW", "FCX", "NEM", "DOW", "DD", "PPG", "ECL", "IFF"],
-            "Real Estate": ["AMT", "PLD", "CCI", "EQIX", "PSA", "EXR", "AVB", "EQR", "MAA", "SPG"],
-            "Utilities": ["NEE", "DUK", "SO", "D", "AEP", "EXC", "XEL", "SRE", "PEG", "WEC"]
-        }
+        self.sector_stocks_map = SECTOR_STOCKS_MAP
 
         # Schedule the universe selection and sector return calculation
         self.schedule.on(self.date_rules.every_day(), self.time_rules.after_market_open(self.spy, 30), self.UpdateUniverse)
@@ -76,6 +82,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
         self.portfolio_stop_loss = 0.06  # 15% portfolio-level stop loss
         self.highest_prices = {}  # Track highest prices for trailing stops
         self.highest_portfolio_value = 0  # Track highest portfolio value
+        self._symbol_str = {}  # str(symbol) memo for logs and universe bookkeeping
         
         # ENHANCED: Position sizing for risk control
         self.max_position_size = 0.15  # Maximum 15% per position
@@ -110,19 +117,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
                 self.log(f"Warmed up with {len(history)} historical data points")
                 
                 # Calculate initial sector returns
-                temp_sector_returns = {}
-                for symbol, df in history.groupby(level=0):
-                    if len(df) >= 2:
-                        start_price = df.iloc[0]['close']
-                        end_price = df.iloc[-1]['close']
-                        
-                        if start_price > 0:
-                            ret = (end_price / start_price) - 1
-                            sector_code = next((k for k, v in self.sector_etf_map.items() if v == symbol), None)
-                            if sector_code:
-                                temp_sector_returns[sector_code] = ret
-                
-                self.sector_returns = temp_sector_returns
+                self.sector_returns = self.calculate_sector_returns(history)
                 self.log(f"Initial sector returns calculated: {self.sector_returns}")
             else:
                 self.log("Warning: Could not get historical data for warmup")
@@ -260,7 +255,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
                         available_stocks.append(stock)
         
         # Remove stocks we already own
-        current_holdings = [str(symbol).split()[0] for symbol in self.portfolio.keys() if self.portfolio[symbol].invested]
+        current_holdings = [self.symbol_str(symbol).split()[0] for symbol in self.portfolio.keys() if self.portfolio[symbol].invested]
         available_stocks = [stock for stock in available_stocks if stock not in current_holdings]
         
         if not available_stocks:
@@ -281,7 +276,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
                 self.log(f"Could not create symbol for replacement stock {stock_ticker}")
                 continue
         
-        self.log(f"Selected {len(replacement_symbols)} replacement stocks: {[str(s) for s in replacement_symbols]}")
+        self.log(f"Selected {len(replacement_symbols)} replacement stocks: {[self.symbol_str(s) for s in replacement_symbols]}")
         return replacement_symbols
 
     # NEW: Clean up blacklist
@@ -472,6 +467,21 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
             self.need_rebalance_after_stop_loss = True
             self.log("Scheduled stop loss executed - will rebalance with new stocks")
 
+    def calculate_sector_returns(self, history):
+        """Return over the history window for every sector ETF, keyed by sector name."""
+        # one column of closes per ETF; first/last valid close per column
+        closes = history['close'].unstack(level=0)
+        first = closes.bfill().iloc[0]
+        last = closes.ffill().iloc[-1]
+        valid = (closes.count() >= 2) & (first > 0)
+        returns = (last[valid] / first[valid]) - 1
+
+        sector_returns = {}
+        for symbol, ret in returns.items():
+            sector_code = self._symbol_to_sector.get(symbol)
+            if sector_code: sector_returns[sector_code] = ret
+        return sector_returns
+
     def UpdateUniverse(self):
         """Update the selected sectors based on ETF performance"""
         # Skip if still in warmup period or in emergency mode
@@ -492,19 +502,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
             self.sector_returns = {}
             return
 
-        temp_sector_returns = {}
-        for symbol, df in history.groupby(level=0):
-            if len(df) < 2: continue
-            
-            start_price = df.iloc[0]['close']
-            end_price = df.iloc[-1]['close']
-            
-            if start_price > 0:
-                ret = (end_price / start_price) - 1
-                sector_code = next((k for k, v in self.sector_etf_map.items() if v == symbol), None)
-                if sector_code: temp_sector_returns[sector_code] = ret
-        
-        self.sector_returns = temp_sector_returns
+        self.sector_returns = self.calculate_sector_returns(history)
         
         # Step 2: Select the top-performing sectors
         sorted_sectors = sorted(self.sector_returns.items(), key=lambda x: x[1], reverse=True)
@@ -557,7 +555,7 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
                 self.log(f"Could not create symbol for {stock_ticker}")
                 continue
         
-        self.log(f"Selected {len(final_universe)} stocks: {[str(s) for s in final_universe]}")
+        self.log(f"Selected {len(final_universe)} stocks: {[self.symbol_str(s) for s in final_universe]}")
         if self.blacklisted_stocks:
             self.log(f"Blacklisted stocks: {list(self.blacklisted_stocks)}")
         
@@ -574,14 +572,21 @@ class RisingSectorFundamentalUniverse(QCAlgorithm):
         
         return final_universe
     
+    def symbol_str(self, symbol):
+        """str(symbol), computed once per Symbol (each str() crosses into .NET)"""
+        s = self._symbol_str.get(symbol)
+        if s is None:
+            s = self._symbol_str[symbol] = str(symbol)
+        return s
+
     def cleanup_stop_loss_tracking(self, new_universe):
         """Clean up stop loss tracking for symbols no longer in universe"""
-        universe_symbols = set(str(s) for s in new_universe)
+        universe_symbols = set(self.symbol_str(s) for s in new_universe)
         
         # Remove tracking for symbols no longer in universe
         symbols_to_remove = []
         for symbol in self.highest_prices.keys():
-            if str(symbol) not in universe_symbols:
+            if self.symbol_str(symbol) not in universe_symbols:
                 symbols_to_remove.append(symbol)
                 
         for symbol in symbols_to_remove:
@@ -80,6 +80,37 @@ class SMMAIndicator:
         return self.current
 
 
+# ---------------------------
+# Fixed-size ring buffer
+# ---------------------------
+# Only the most recent values of each series are ever read, so instead of
+# growing Python lists the series live in a preallocated float64 array.
+class RingBuffer:
+    """Fixed-capacity float64 series keeping only the most recent `capacity` values."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # every value is written twice so the stored window is always one contiguous slice
+        self._buf = np.empty(2 * capacity, dtype=np.float64)
+        self._pos = 0
+        self._size = 0
+
+    def push(self, value):
+        self._buf[self._pos] = value
+        self._buf[self._pos + self.capacity] = value
+        pos = self._pos + 1
+        self._pos = 0 if pos == self.capacity else pos
+        if self._size < self.capacity:
+            self._size += 1
+
+    def tail(self, k):
+        """Zero-copy view of the last k stored values (fewer if not filled yet), oldest first."""
+        end = self._pos + self.capacity
+        return self._buf[end - min(k, self._size):end]
+
+    def __len__(self):
+        return self._size
+
+
 # ---------------------------
 # Main Algorithm
 # ---------------------------
@@ -108,6 +139,9 @@ class AlligatorStopLossQC(QCAlgorithm):
         self.atr_period = 14
         self.atr_multiplier = 0.2
 
+        # Bars used by the EMA trend check
+        self.trend_window = 20
+
         # State variables
         self.entryPrice = None
         self.highestPrice = None
@@ -136,22 +170,22 @@ class AlligatorStopLossQC(QCAlgorithm):
             self.log("No history data found for warm-up period. Cannot proceed.")
             return
 
-        # Initialize lists to store indicator values for the trend check function
-        self.hl2s, self.lips_list, self.teeth_list, self.jaws_list = [], [], [], []
+        # Fixed-size buffers holding the recent indicator values for the trend check function
+        n = self.trend_window
+        self.hl2s, self.lips_list, self.teeth_list = RingBuffer(n), RingBuffer(n), RingBuffer(n)
 
         for bar in history.itertuples():
             hl2 = (bar.high + bar.low) / 2.0
             
             # Update custom SMMA indicators
-            jaw_val = self.jaw.Update(hl2)
+            self.jaw.Update(hl2)
             teeth_val = self.teeth.Update(hl2)
             lips_val = self.lips.Update(hl2)
 
             # Store the values for the trend check
-            self.hl2s.append(hl2)
-            self.jaws_list.append(jaw_val)
-            self.teeth_list.append(teeth_val)
-            self.lips_list.append(lips_val)
+            self.hl2s.push(hl2)
+            self.teeth_list.push(teeth_val)
+            self.lips_list.push(lips_val)
 
         # Set initial 'previous' values for the first bar of the live data
         self.jaw_prev = self.jaw.Current
@@ -227,10 +261,9 @@ class AlligatorStopLossQC(QCAlgorithm):
         lips = self.lips.Update(hl2)
 
         # Store indicator values for trend check and for the next bar's 'previous' values
-        self.hl2s.append(hl2)
-        self.lips_list.append(lips)
-        self.teeth_list.append(teeth)
-        self.jaws_list.append(jaw)
+        self.hl2s.push(hl2)
+        self.lips_list.push(lips)
+        self.teeth_list.push(teeth)
         
         # Plot indicators to chart
         self.plot(f"{self.ticker_str} Price", "Jaw", jaw)
@@ -244,7 +277,7 @@ class AlligatorStopLossQC(QCAlgorithm):
         # --- Trading Logic ---
         if self.portfolio.invested:
             if self.cooldown_days_remaining == 0:
-                self.check_exit(bar, jaw, teeth, lips)
+                self.check_exit(bar, jaw, teeth, lips, self.atr_sl.Current.Value)
         else:
             if self.cooldown_days_remaining > 0:
                 self.cooldown_days_remaining -= 1
@@ -260,14 +293,15 @@ class AlligatorStopLossQC(QCAlgorithm):
         Entry logic based on Alligator and trend conditions.
         """
         # Condition 1: Check for trend
-        # We need at least 20 bars to perform the trend check
-        if len(self.hl2s) < 20:
+        # We need at least trend_window bars to perform the trend check
+        w = self.trend_window
+        if len(self.hl2s) < w:
             return
             
         trend_ok = is_trending_ema(
-            np.array(self.hl2s[-20:]),
-            np.array(self.lips_list[-20:]),
-            np.array(self.teeth_list[-20:])
+            self.hl2s.tail(w),
+            self.lips_list.tail(w),
+            self.teeth_list.tail(w)
         )
         if not trend_ok:
             return
@@ -287,7 +321,7 @@ class AlligatorStopLossQC(QCAlgorithm):
         if lips_cross_up:
             self.buy(bar, "Lips cross up")
 
-    def check_exit(self, bar, jaw, teeth, lips):
+    def check_exit(self, bar, jaw, teeth, lips, atr_value):
         """
         Exit logic based on ATR stop-loss and Alligator conditions.
         """
@@ -295,7 +329,6 @@ class AlligatorStopLossQC(QCAlgorithm):
             return
 
         price = bar.Close
-        atr_value = self.atr_sl.Current.Value
 
         # Exit Condition 1: ATR-based stop loss
         atr_stop = self.entryPrice - self.atr_multiplier * atr_value
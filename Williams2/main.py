@@ -1,6 +1,8 @@
 # region imports
 from AlgorithmImports import *
 import numpy as np
+from scipy.signal import lfilter
+from numba_utils import njit
 # endregion
 
 
@@ -48,6 +50,23 @@ def hurst_exponent(ts, max_lag=None):
     H = float(poly[0])
     return H
 
+@njit(cache=True)
+def _ema_with_slope(ts, short, long):
+    """
+    Run the short and long EMAs (both seeded with ts[0]) over ts in one pass.
+    Return (short EMA > long EMA at the end, relative slope of the short EMA).
+    """
+    a_s = 2.0 / (short + 1)
+    a_l = 2.0 / (long + 1)
+    s = ts[0]
+    l = ts[0]
+    for i in range(1, ts.shape[0]):
+        s = a_s * ts[i] + (1.0 - a_s) * s
+        l = a_l * ts[i] + (1.0 - a_l) * l
+    slope = (s - ts[0]) / ts[0]  # relative slope over window
+    return s > l, slope
+
+
 def is_trending_ema(ts1, ts2, ts3, short=5, long=20, slope_threshold=0.01):
     """
     Bullish trend if short EMA > long EMA
@@ -57,20 +76,8 @@ def is_trending_ema(ts1, ts2, ts3, short=5, long=20, slope_threshold=0.01):
     if len(ts1) < long:
         return False
 
-    import numpy as np
-
-    def ema(arr, period):
-        alpha = 2/(period+1)
-        out = [arr[0]]
-        for price in arr[1:]:
-            out.append(alpha*price + (1-alpha)*out[-1])
-        return np.array(out)
-
     def ema_with_slope(ts, short, long):
-        s = ema(ts[-long:], short)
-        l = ema(ts[-long:], long)
-        slope = (s[-1] - s[0]) / s[0]  # relative slope over window
-        return s[-1] > l[-1], slope
+        return _ema_with_slope(np.asarray(ts[-long:], dtype=np.float64), short, long)
 
     test1, slope1 = ema_with_slope(ts1, short, long)
     test2, slope2 = ema_with_slope(ts2, short, long)
@@ -106,6 +113,27 @@ class SMMAIndicator:
         self.count += 1
         return self.current
 
+    def update_many(self, prices):
+        """Feed an array of prices in one call. Returns the SMMA value after each price."""
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(prices) == 0:
+            return prices
+        seeded = self.current is None
+        if seeded:
+            self.current = float(prices[0])
+            rest = prices[1:]
+        else:
+            rest = prices
+        self.count += len(prices)
+        if len(rest) == 0:
+            return prices[:1].copy()
+
+        # current = (current*(L-1) + price)/L as a first-order IIR filter
+        L = self.length
+        out = lfilter([1.0 / L], [1.0, -(L - 1) / L], rest, zi=[self.current * (L - 1) / L])[0]
+        self.current = float(out[-1])
+        return np.concatenate((prices[:1], out)) if seeded else out
+
     @property
     def IsReady(self):
         return self.count >= self.length
@@ -115,6 +143,84 @@ class SMMAIndicator:
         return self.current
 
 
+# ---------------------------
+# Fixed-size ring buffer
+# ---------------------------
+class RingBuffer:
+    """Fixed-capacity float64 series keeping only the most recent `capacity` values."""
+    def __init__(self, capacity, stats_window=0):
+        """stats_window > 0 also keeps a rolling Welford mean / M2 of the last stats_window values."""
+        self.capacity = capacity
+        # every value is written twice so the stored window is always one contiguous slice
+        self._buf = np.empty(2 * capacity, dtype=np.float64)
+        self._pos = 0
+        self._size = 0
+        self.count = 0  # total values pushed since creation
+        self.stats_window = min(stats_window, capacity)
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from _mean
+
+    def push(self, value):
+        n = self.stats_window
+        if n:
+            if self._size >= n:
+                # fixed-size Welford step: the value dropping out of the stats window is replaced
+                old = self._buf[self._pos + self.capacity - n]
+                mean = self._mean + (value - old) / n
+                self._m2 += (value - old) * (value - mean + old - self._mean)
+                self._mean = mean
+            else:
+                delta = value - self._mean
+                self._mean += delta / (self._size + 1)
+                self._m2 += delta * (value - self._mean)
+        self._buf[self._pos] = value
+        self._buf[self._pos + self.capacity] = value
+        pos = self._pos + 1
+        self._pos = 0 if pos == self.capacity else pos
+        if self._size < self.capacity:
+            self._size += 1
+        self.count += 1
+        if n and self._size >= n and self.count % n == 0:
+            # re-derive the window stats exactly every n pushes so rounding drift cannot build up
+            window = self.tail(n)
+            self._mean = window.mean()
+            self._m2 = float(np.square(window - self._mean).sum())
+
+    def extend(self, values):
+        """Push every value in order (only the last `capacity` are actually kept)."""
+        skipped = max(0, len(values) - self.capacity)
+        for value in values[skipped:]:
+            self.push(value)
+        self.count += skipped
+
+    def last(self, k=1):
+        """k-th most recent value (1 = newest), same as list[-k]."""
+        return self._buf[self._pos + self.capacity - k]
+
+    def tail(self, k):
+        """Zero-copy view of the last k stored values (fewer if not filled yet), oldest first."""
+        end = self._pos + self.capacity
+        return self._buf[end - min(k, self._size):end]
+
+    def window_mean_std(self):
+        """Mean and population std of the last stats_window values (valid once that many are stored)."""
+        mean = self._mean
+        var = self._m2 / self.stats_window
+        # a flat window leaves only rounding residue: report it as exactly 0 so std == 0 checks hold
+        if var <= 1e-12 * mean * mean:
+            return mean, 0.0
+        return mean, var ** 0.5
+
+    def __len__(self):
+        return self._size
+
+
+# ---------------------------
+# Exit reasons (bit flags, lower bit = higher priority)
+# ---------------------------
+EXIT_TRAILING, EXIT_HARD_STOP, EXIT_TEETH_CROSS, EXIT_JAW_CROSS = 1, 2, 4, 8
+
+
 # ---------------------------
 # Main Algorithm
 # ---------------------------
@@ -129,10 +235,6 @@ class AlligatorStopLossQC(QCAlgorithm):
         self.chosen_symbol = self.add_equity(self.ticker_str, Resolution.DAILY).Symbol
         self.set_benchmark(self.ticker_str)
 
-        # --- Series buffers ---
-        self.hl2s, self.highs, self.lows, self.closes = [], [], [], []
-        self.lips_list, self.teeth_list, self.jaws_list = [], [], []
-
         # --- Params (tune here) ---
         self.alligator_warm_up      = 100
         self.window_size            = 40           # Hurst window length gate
@@ -150,6 +252,7 @@ class AlligatorStopLossQC(QCAlgorithm):
 
         # Lips vs HL2 gap filter (blocks if HL2 too far above lips)
         self.lips_price_gap_pct     = 6.00          # percent (e.g., 1.0 => 1%)
+        self._lips_gap_mult         = 1.0 + 0.01 * self.lips_price_gap_pct
 
         # Cooldown after buying
         self.cooldown_days_remaining = 0   # tracks how many days left to wait
@@ -158,10 +261,19 @@ class AlligatorStopLossQC(QCAlgorithm):
         # Exits
         self.stopLossPct            = 0.003   # * 100 = %  hard stop from entry
         self.trailingStopPct        = 0.003    # * 100 = % trailing from highest since entry
+        self._stop_mult             = 1.0 - self.stopLossPct
+        self._trail_mult            = 1.0 - self.trailingStopPct
 
         # Alligator lengths
         self.jawLength, self.teethLength, self.lipsLength = 20, 12, 8
 
+        # --- Series buffers (fixed size, only the recent tail is ever read) ---
+        self.trend_window = 20
+        n = max(self.window_size, self.trend_window, self.price_filter_lookback)
+        self.hl2s = RingBuffer(n, stats_window=self.price_filter_lookback)
+        self.highs, self.lows, self.closes = RingBuffer(n), RingBuffer(n), RingBuffer(n)
+        self.lips_list, self.teeth_list, self.jaws_list = RingBuffer(n), RingBuffer(n), RingBuffer(n)
+
         # State
         self.entryPrice     = None
         self.highestPrice   = None
@@ -171,21 +283,16 @@ class AlligatorStopLossQC(QCAlgorithm):
         self.jaw   = SMMAIndicator(self.jawLength)
         self.teeth = SMMAIndicator(self.teethLength)
         self.lips  = SMMAIndicator(self.lipsLength)
-
-        self.lips_list.append(self.lips)
-        self.teeth_list.append(self.teeth)
-        self.jaws_list.append(self.jaw)
+        # Compile the trend kernel now so the first trading bar doesn't pay for it
+        _ema_with_slope(np.ones(2), 5, 20)
 
         # Warm-up indicators with history
         history = self.history(self.chosen_symbol, timedelta(days=self.alligator_warm_up), Resolution.DAILY)
-        for bar in history.itertuples():
-            hl2 = (bar.high + bar.low) / 2.0
-            jaw_val = self.jaw.Update(hl2)
-            teeth_val = self.teeth.Update(hl2)
-            lips_val = self.lips.Update(hl2)
-            self.lips_list.append(lips_val)
-            self.teeth_list.append(teeth_val)
-            self.jaws_list.append(jaw_val)
+        if not history.empty:
+            hl2_arr = ((history["high"] + history["low"]) / 2.0).to_numpy(dtype=np.float64)
+            self.jaws_list.extend(self.jaw.update_many(hl2_arr))
+            self.teeth_list.extend(self.teeth.update_many(hl2_arr))
+            self.lips_list.extend(self.lips.update_many(hl2_arr))
 
         self.startingValue = self.portfolio.total_portfolio_value
 
@@ -280,23 +387,23 @@ class AlligatorStopLossQC(QCAlgorithm):
         """Update rolling arrays and SMMA lines. Return (hl2, jaw, teeth, lips) or (None, ... ) if not ready."""
         hl2 = (bar.High + bar.Low) / 2.0
 
-        self.highs.append(bar.High)
-        self.lows.append(bar.Low)
-        self.closes.append(bar.Close)
-        self.hl2s.append(hl2)
+        self.highs.push(bar.High)
+        self.lows.push(bar.Low)
+        self.closes.push(bar.Close)
+        self.hl2s.push(hl2)
 
         # Need at least one full period of the longest SMMA
         min_len = max(self.jawLength, self.teethLength, self.lipsLength) + 1
-        if len(self.hl2s) < min_len:
+        if self.hl2s.count < min_len:
             return None, None, None, None
 
         jaw = self.jaw.Update(hl2)
         teeth = self.teeth.Update(hl2)
         lips = self.lips.Update(hl2)
 
-        self.lips_list.append(lips)
-        self.teeth_list.append(teeth)
-        self.jaws_list.append(jaw)
+        self.lips_list.push(lips)
+        self.teeth_list.push(teeth)
+        self.jaws_list.push(jaw)
 
         return hl2, jaw, teeth, lips
 
@@ -305,18 +412,18 @@ class AlligatorStopLossQC(QCAlgorithm):
         if self.check_Hurst_exponent:
             if len(self.hl2s) < self.window_size:
                 return False
-            return is_trending(np.array(self.hl2s[-self.window_size:]), threshold=self.hurst_threshold)
+            return is_trending(self.hl2s.tail(self.window_size), threshold=self.hurst_threshold)
         else:
             # lightweight trend
-            return is_trending_ema(self.hl2s[-20:], self.lips_list[-20:], self.teeth_list[-20:])
+            w = self.trend_window
+            return is_trending_ema(self.hl2s.tail(w), self.lips_list.tail(w), self.teeth_list.tail(w))
 
 
     def lips_price_gap_ok(self, lips_val, hl2):
         """Block if HL2 is more than X% above lips."""
         if self.lips_price_gap_pct < 0:  # bypass if negative pct is defined
             return True
-        gap = 1.0 + 0.01 * float(self.lips_price_gap_pct)
-        ok = not (lips_val * gap < hl2)
+        ok = not (lips_val * self._lips_gap_mult < hl2)
         if not ok:
             self.log(f"{self.time} - Blocked: HL2 is more than {self.lips_price_gap_pct:.1f}% above lips "
                      f"(hl2={hl2:.2f}, lips={lips_val:.2f})")
@@ -337,9 +444,7 @@ class AlligatorStopLossQC(QCAlgorithm):
         if len(self.hl2s) < lb:
             return False
 
-        window = self.hl2s[-lb:]
-        sma = float(np.mean(window))
-        std = float(np.std(window))
+        sma, std = self.hl2s.window_mean_std()
         if std == 0.0:
             return True
 
@@ -425,37 +530,31 @@ class AlligatorStopLossQC(QCAlgorithm):
         if self.highestPrice is None or price > self.highestPrice:
             self.highestPrice = price
 
-        # 1) Trailing stop
-        if price <= self.highestPrice * (1 - self.trailingStopPct):
-            self.sell(bar, f"trailing stop {int(self.trailingStopPct*100)}% from {self.highestPrice:.2f}")
-            self.wait_peak_check = True
+        # All exit conditions are evaluated up front and packed into one bit mask;
+        # the lowest set bit is the highest-priority reason:
+        #   1) trailing stop, 2) hard stop from entry,
+        #   3) lips cross below teeth with buffer (exit on weakness), 4) lips cross below jaw
+        # (the *_prev values are assigned together, so one None check covers all of them)
+        lips_prev = self.lips_prev
+        have_prev = lips_prev is not None
+        reason = ((price <= self.highestPrice * self._trail_mult)
+                  | (price <= self.entryPrice * self._stop_mult) << 1
+                  | (have_prev and lips_prev >= self.teeth_prev and 1.05 * lips < teeth) << 2
+                  | (have_prev and lips_prev >= self.jaw_prev and lips < jaw) << 3)
+        if not reason:
             return
 
-        # 2) Hard stop from entry
-        if price <= self.entryPrice * (1 - self.stopLossPct):
-            self.sell(bar, f"hard stop {int(self.stopLossPct*100)}% from entry {self.entryPrice:.2f}")
-            self.wait_peak_check = True
-            return
-
-        # 3) Lips cross below Teeth with buffer (exit on weakness)
-        lips_cross_down_with_buffer = (
-            self.lips_prev is not None and self.teeth_prev is not None and
-            self.lips_prev >= self.teeth_prev and 1.05 * lips < teeth
-        )
-        if lips_cross_down_with_buffer:
-            self.sell(bar, "lips crossed below teeth (buffer)")
-            self.wait_peak_check = True
-            return
-
-        # 4) Lips cross below Jaw
-        lips_below_jaw = (
-            self.lips_prev is not None and self.jaw_prev is not None and
-            self.lips_prev >= self.jaw_prev and lips < jaw
-        )
-        if lips_below_jaw:
-            self.sell(bar, "lips crossed below jaw")
-            self.wait_peak_check = True
-            return
+        reason &= -reason
+        if reason == EXIT_TRAILING:
+            msg = f"trailing stop {int(self.trailingStopPct*100)}% from {self.highestPrice:.2f}"
+        elif reason == EXIT_HARD_STOP:
+            msg = f"hard stop {int(self.stopLossPct*100)}% from entry {self.entryPrice:.2f}"
+        elif reason == EXIT_TEETH_CROSS:
+            msg = "lips crossed below teeth (buffer)"
+        else:
+            msg = "lips crossed below jaw"
+        self.sell(bar, msg)
+        self.wait_peak_check = True
 
 
     # ---------- Main Bar Handler ----------
@@ -474,8 +573,8 @@ class AlligatorStopLossQC(QCAlgorithm):
             # still warming up SMMA / buffers
             # self.log(f"{self.time} - Warming up: collected {len(self.hl2s)} hl2 values")
             return
-        if len(self.hl2s) == 20: # TODO: plug in here the window size global replacing 20
-            self.log(f"{self.time} - Warm up done : collected {len(self.hl2s)} hl2 values")
+        if self.hl2s.count == self.trend_window:
+            self.log(f"{self.time} - Warm up done : collected {self.hl2s.count} hl2 values")
 
         # ---------- plot price & alligator lines ----------
         symbol_price = self.securities[self.chosen_symbol].price
@@ -500,20 +599,13 @@ class AlligatorStopLossQC(QCAlgorithm):
 
         # ---------- Entry / Exit decision ----------
         if not self.portfolio.invested:
-            # Before calling check_entry, print the key filter values so you can see them in logs
-            try:
-                # z-score diagnostic if enough lookback
-                lb = int(getattr(self, "price_filter_lookback", 0))
-                if len(self.hl2s) >= lb and lb > 0:
-                    window = self.hl2s[-lb:]
-                    sma = float(np.mean(window))
-                    std = float(np.std(window))
-                    hl2_now = hl2
-                    z = (hl2_now - sma) / std if std != 0 else float("nan")
-                    # self.log(f"{self.time} - Z-score check: z={z:.2f} (k={self.price_filter_k})")
-            except Exception as _e:
-                # safe guard — don't crash OnData for logging
-                pass
+            # Before calling check_entry, uncomment to print the z-score filter value in logs
+            # (kept out of the per-bar path: it is only worth computing when it gets logged)
+            # lb = int(self.price_filter_lookback)
+            # if len(self.hl2s) >= lb and lb > 0:
+            #     sma, std = self.hl2s.window_mean_std()
+            #     z = (hl2 - sma) / std if std != 0 else float("nan")
+            #     self.log(f"{self.time} - Z-score check: z={z:.2f} (k={self.price_filter_k})")
 
             # call your existing entry routine (which enforces startup_once behavior)
             self.check_entry(bar, hl2, jaw, teeth, lips)
@@ -0,0 +1,21 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+
+# ---------------------------
+# Numba JIT with graceful fallback
+# ---------------------------
+# Hot scalar kernels are decorated with `njit` from here. If numba is not
+# available in the running environment the decorator is a no-op and the
+# kernels run as plain Python with identical results.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and parametrized use)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator